@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+샤딩/압축 JSONL 아카이브 (영상 ID로 1건씩 바로 읽기)
+
+- 키워드별(또는 전체) 샤드 파일에 영상 1건 = JSON 1줄로 기록, 샤드가 커지면 다음 파일로 교체
+- 레코드마다 독립된 gzip 멤버(또는 zstd 프레임)로 압축하여 이어 붙임
+  (여러 멤버를 이어 붙인 gzip 파일은 zcat 등으로 전체를 그대로 풀 수 있음)
+- index.tsv 에 video_id → (샤드, 오프셋, 길이)를 기록하여 mmap/seek로 1건만 읽기 가능
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+INDEX_FILE = "index.tsv"
+EXTENSIONS = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+
+def compress(data, compression):
+    """레코드 1건 압축 (독립적으로 풀 수 있는 단위)"""
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data, compression):
+    """레코드 1건 압축 해제"""
+    if compression == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def check_compression(compression):
+    """압축 방식에 필요한 라이브러리 확인 - 없으면 RuntimeError (수집 시작 전에 호출)"""
+    if compression == 'zstd' and zstandard is None:
+        raise RuntimeError("zstd 압축을 사용하려면 pip install zstandard 를 실행하세요.")
+
+
+def shard_prefix(keyword):
+    """키워드를 파일명으로 쓸 수 있게 변환 (겹치지 않도록 해시 접미사)"""
+    slug = re.sub(r'[^\w-]+', '_', keyword).strip('_')[:40] or 'none'
+    return f"{slug}-{hashlib.sha1(keyword.encode('utf-8')).hexdigest()[:8]}"
+
+
+class JsonlArchiveWriter:
+    def __init__(self, archive_dir, compression='gzip', shard_by='keyword', max_shard_bytes=256 * 1024 * 1024,
+                 max_open_shards=64):
+        check_compression(compression)
+        self.archive_dir = archive_dir
+        self.compression = compression
+        self.shard_by = shard_by  # 'keyword' 또는 'size'
+        self.max_shard_bytes = max_shard_bytes
+        self.max_open_shards = max_open_shards  # 키워드가 많을 때 동시에 열어둘 최대 파일 수
+        self.shards = {}  # 샤드 접두사 -> (번호, 파일 객체 또는 None)
+        os.makedirs(archive_dir, exist_ok=True)
+        self.index = open(os.path.join(archive_dir, INDEX_FILE), 'a', encoding='utf-8')
+
+    def shard_for(self, keyword):
+        """기록할 샤드 파일 (크기 제한을 넘으면 다음 번호로 교체)"""
+        prefix = shard_prefix(keyword) if self.shard_by == 'keyword' else 'all'
+        number, file = self.shards.get(prefix, (0, None))
+
+        if file is None:
+            # 열린 파일이 너무 많으면 가장 먼저 연 샤드를 닫음
+            open_prefixes = [key for key, (_, item) in self.shards.items() if item is not None]
+            if len(open_prefixes) >= self.max_open_shards:
+                oldest_number, oldest = self.shards[open_prefixes[0]]
+                oldest.close()
+                self.shards[open_prefixes[0]] = (oldest_number, None)
+            file = self.open_shard(prefix, number)
+
+        while file.tell() >= self.max_shard_bytes:
+            file.close()
+            number += 1
+            file = self.open_shard(prefix, number)
+
+        self.shards[prefix] = (number, file)
+        return file
+
+    def open_shard(self, prefix, number):
+        """샤드 파일 열기 (이어 쓰기)"""
+        name = f"{prefix}-{number:04d}{EXTENSIONS[self.compression]}"
+        return open(os.path.join(self.archive_dir, name), 'ab')
+
+    def write(self, record):
+        """레코드(dict) 1건 기록"""
+        data = compress(
+            (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'),
+            self.compression
+        )
+        file = self.shard_for(record.get('keyword', ''))
+        offset = file.tell()
+        file.write(data)
+        self.index.write(f"{record['video_id']}\t{os.path.basename(file.name)}\t{offset}\t{len(data)}\n")
+
+    def close(self):
+        for _, file in self.shards.values():
+            if file is not None:
+                file.close()
+        self.index.close()
+
+
+class JsonlArchive:
+    """아카이브 읽기 - archive.get(video_id)"""
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.index = {}
+        self.maps = {}
+        with open(os.path.join(archive_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+            for line in f:
+                video_id, shard, offset, length = line.rstrip('\n').split('\t')
+                # 같은 영상이 여러 번 기록되었으면 마지막 기록 사용
+                self.index[video_id] = (shard, int(offset), int(length))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, video_id):
+        return video_id in self.index
+
+    def get(self, video_id):
+        """영상 1건 읽기 (없으면 None)"""
+        entry = self.index.get(video_id)
+        if entry is None:
+            return None
+        shard, offset, length = entry
+
+        shard_map = self.maps.get(shard)
+        if shard_map is None:
+            with open(os.path.join(self.archive_dir, shard), 'rb') as f:
+                shard_map = self.maps[shard] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        compression = 'zstd' if shard.endswith(EXTENSIONS['zstd']) else 'gzip'
+        return json.loads(decompress(shard_map[offset:offset + length], compression))
+
+    def close(self):
+        for shard_map in self.maps.values():
+            shard_map.close()
+        self.maps = {}
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+단계별 CPU/메모리 프로파일러 (--profile 옵션)
+
+- 단계마다 cProfile 결과를 따로 누적 (중첩된 단계는 안쪽 단계에만 집계)
+- tracemalloc으로 단계별 메모리 증가량/최대 사용량과 첫 실행 시 할당 위치 기록
+- 실행 종료 시 단계별 보고서, 메모리 상위 할당 목록, 콜그래프(.prof) 파일 저장
+  (.prof 파일은 snakeviz, gprof2dot 등 pstats 호환 도구로 열 수 있음)
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class StageStats:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.calls = 0
+        self.total_time = 0.0
+        self.memory_delta = 0  # 단계 실행 전후 메모리 증가량 합계 (bytes)
+        self.memory_peak = 0  # 단계 실행 중 최대 메모리 사용량 (bytes)
+        self.first_snapshot = None  # 첫 실행 시작 시점 스냅샷
+        self.allocations = None  # 첫 실행에서 늘어난 할당 위치 (상위 N개)
+
+
+class StageProfiler:
+    def __init__(self, enabled=False, output_dir="profile_reports", top_n=20, logger=None):
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.logger = logger or logging.getLogger(__name__)
+        self.stages = {}
+        self.active = []  # 실행 중인 단계 (중첩 순서)
+
+    @contextmanager
+    def stage(self, name):
+        """단계 실행 구간 측정 - with profiler.stage('이름'): ..."""
+        if not self.enabled:
+            yield
+            return
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        stats = self.stages.setdefault(name, StageStats())
+        first_call = stats.calls == 0
+        if first_call:
+            stats.first_snapshot = tracemalloc.take_snapshot()
+
+        # cProfile은 동시에 하나만 활성화 가능 - 바깥 단계는 잠시 멈춤
+        if self.active:
+            self.active[-1].profile.disable()
+        self.active.append(stats)
+
+        memory_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        stats.profile.enable()
+        try:
+            yield
+        finally:
+            stats.profile.disable()
+            stats.total_time += time.perf_counter() - started
+            stats.calls += 1
+            current, peak = tracemalloc.get_traced_memory()
+            stats.memory_delta += current - memory_before
+            stats.memory_peak = max(stats.memory_peak, peak)
+
+            if first_call:
+                snapshot = tracemalloc.take_snapshot()
+                stats.allocations = snapshot.compare_to(stats.first_snapshot, 'lineno')[:self.top_n]
+                stats.first_snapshot = None
+
+            self.active.pop()
+            if self.active:
+                self.active[-1].profile.enable()
+
+    def write_reports(self):
+        """단계별 보고서 저장 - 저장한 폴더 경로 반환"""
+        if not self.enabled or not self.stages:
+            return None
+
+        report_dir = os.path.join(self.output_dir, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        os.makedirs(report_dir, exist_ok=True)
+
+        summary = [f"{'단계':<20}{'호출':>8}{'총 시간(s)':>14}{'평균(ms)':>12}{'메모리 증가(KB)':>18}{'최대 메모리(KB)':>18}"]
+        combined = None
+
+        for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].total_time):
+            filename = re.sub(r'[^\w.-]', '_', name)
+
+            # 콜그래프 파일 (pstats 형식)
+            stats.profile.dump_stats(os.path.join(report_dir, f"{filename}.prof"))
+            if combined is None:
+                combined = pstats.Stats(stats.profile)
+            else:
+                combined.add(stats.profile)
+
+            # 단계별 텍스트 보고서
+            stream = io.StringIO()
+            pstats.Stats(stats.profile, stream=stream).sort_stats('cumulative').print_stats(self.top_n)
+            with open(os.path.join(report_dir, f"{filename}.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"단계: {name}\n호출: {stats.calls}회, 총 {stats.total_time:.3f}초\n\n")
+                f.write(stream.getvalue())
+                f.write(f"\n첫 실행 메모리 할당 상위 {self.top_n}개:\n")
+                for stat in stats.allocations or []:
+                    f.write(f"{stat}\n")
+
+            summary.append(
+                f"{name:<20}{stats.calls:>8}{stats.total_time:>14.3f}"
+                f"{stats.total_time / stats.calls * 1000:>12.1f}"
+                f"{stats.memory_delta / 1024:>18.1f}{stats.memory_peak / 1024:>18.1f}"
+            )
+
+        combined.dump_stats(os.path.join(report_dir, "callgraph.prof"))
+
+        with open(os.path.join(report_dir, "summary.txt"), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(summary) + '\n')
+
+        # 실행 종료 시점 메모리 상위 할당 위치
+        snapshot = tracemalloc.take_snapshot()
+        with open(os.path.join(report_dir, "memory_top.txt"), 'w', encoding='utf-8') as f:
+            for stat in snapshot.statistics('lineno')[:self.top_n]:
+                f.write(f"{stat}\n")
+
+        self.logger.info(f"프로파일 보고서 저장: {report_dir}")
+        return report_dir
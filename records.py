@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+수집 데이터 레코드 (Video / Comment / Channel)
+
+- __slots__ 로 영상/댓글 1건당 메모리 사용량 절감 (dict 대비)
+- 체크포인트는 튜플 목록을 pickle로 저장 (JSON indent 저장보다 빠르고 작음)
+  튜플 필드 이름 목록을 헤더에 함께 저장하여, 필드가 추가/변경되어도 이름으로 복원
+- to_dict() / from_dict() 로 JSON 내보내기 및 이전 progress.json 호환
+"""
+
+import os
+import pickle
+
+# 체크포인트 형식 버전 (헤더 구조가 바뀌면 올림)
+CHECKPOINT_VERSION = 1
+
+
+class Comment:
+    __slots__ = ('author', 'text', 'like_count', 'published_at')
+
+    def __init__(self, author, text, like_count=0, published_at=''):
+        self.author = author
+        self.text = text
+        self.like_count = like_count
+        self.published_at = published_at
+
+    def to_tuple(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+
+class Channel:
+    __slots__ = ('channel_id', 'subscriber_count')
+
+    def __init__(self, channel_id, subscriber_count=0):
+        self.channel_id = channel_id
+        self.subscriber_count = subscriber_count
+
+
+class Video:
+    __slots__ = (
+        'video_id', 'keyword', 'title', 'description', 'channel_title', 'published_at',
+        'view_count', 'like_count', 'comment_count', 'duration', 'tags', 'category_id',
+        'subscriber_count', 'thumbnail_filename', 'transcript', 'comments'
+    )
+
+    def __init__(self, video_id, keyword='', title='', description='', channel_title='',
+                 published_at='', view_count=0, like_count=0, comment_count=0, duration='',
+                 tags='', category_id='', subscriber_count=0, thumbnail_filename='',
+                 transcript='', comments=None):
+        self.video_id = video_id
+        self.keyword = keyword
+        self.title = title
+        self.description = description
+        self.channel_title = channel_title
+        self.published_at = published_at
+        self.view_count = view_count
+        self.like_count = like_count
+        self.comment_count = comment_count
+        self.duration = duration
+        self.tags = tags
+        self.category_id = category_id
+        self.subscriber_count = subscriber_count
+        self.thumbnail_filename = thumbnail_filename
+        self.transcript = transcript
+        self.comments = comments or []
+
+    def to_tuple(self):
+        """체크포인트용 튜플 (댓글도 튜플로 변환)"""
+        values = [getattr(self, name) for name in self.__slots__[:-1]]
+        values.append(tuple(comment.to_tuple() for comment in self.comments))
+        return tuple(values)
+
+    @classmethod
+    def from_tuple(cls, values, fields, comment_fields):
+        """to_tuple() 결과로 복원 - fields/comment_fields는 저장 당시의 필드 이름 목록
+
+        현재 클래스에 없는 필드는 무시하고, 저장 당시 없던 필드는 기본값 사용
+        """
+        data = dict(zip(fields, values))
+        comments = data.pop('comments', ())
+        video = cls(**{name: value for name, value in data.items() if name in cls.__slots__})
+        video.comments = [
+            Comment(**{
+                name: value for name, value in zip(comment_fields, comment) if name in Comment.__slots__
+            })
+            for comment in comments
+        ]
+        return video
+
+    def to_dict(self):
+        """JSON 내보내기용 dict"""
+        data = {name: getattr(self, name) for name in self.__slots__[:-1]}
+        data['comments'] = [comment.to_dict() for comment in self.comments]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        fields = {name: data[name] for name in cls.__slots__[:-1] if name in data}
+        fields['comments'] = [Comment.from_dict(comment) for comment in data.get('comments', [])]
+        return cls(**fields)
+
+
+def dump_checkpoint(path, videos, **extra):
+    """영상 목록과 부가 데이터를 바이너리 체크포인트로 저장"""
+    data = dict(
+        extra,
+        format_version=CHECKPOINT_VERSION,
+        video_fields=Video.__slots__,
+        comment_fields=Comment.__slots__,
+        videos=[video.to_tuple() for video in videos]
+    )
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    # 저장 도중 중단되어도 기존 체크포인트가 손상되지 않도록 교체
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """바이너리 체크포인트 불러오기 - (영상 목록, 부가 데이터)"""
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    fields = data.pop('video_fields')
+    comment_fields = data.pop('comment_fields')
+    data.pop('format_version', None)
+    videos = [Video.from_tuple(values, fields, comment_fields) for values in data.pop('videos', [])]
+    return videos, data
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+수집 실패 URL 재시도 큐
+
+- 영구 실패는 정상 응답에 영상이 없을 때(삭제/비공개)만 기록하고 다시 요청하지 않음
+- 영상별 처리 실패는 시도 횟수와 다음 재시도 가능 시각을 저장 (지수 백오프, 횟수 초과 시 영구)
+- 요청 전체가 실패한 경우(네트워크/서버/권한 설정/할당량)는 영상 탓이 아니므로
+  시도 횟수에 넣지 않고 미루기만 함 (할당량 초과는 할당량 초기화 시각까지)
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+
+class RetryQueue:
+    def __init__(self, queue_file="retry_queue.json", base_delay=600, max_attempts=5, max_deferral=6 * 3600,
+                 logger=None):
+        self.queue_file = queue_file
+        self.base_delay = base_delay  # 첫 재시도까지 대기 시간 (초), 이후 2배씩 증가
+        self.max_attempts = max_attempts
+        self.max_deferral = max_deferral  # 요청 단위 오류로 미룰 때 최대 대기 시간 (초)
+        self.logger = logger or logging.getLogger(__name__)
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """재시도 큐 불러오기"""
+        if os.path.exists(self.queue_file):
+            try:
+                with open(self.queue_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                self.logger.error(f"재시도 큐 불러오기 실패: {e}")
+
+    def save(self):
+        """재시도 큐 저장"""
+        try:
+            with open(self.queue_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.error(f"재시도 큐 저장 실패: {e}")
+
+    def record_failure(self, key, url, keyword, reason, transient):
+        """영상별 실패 기록 - key는 비디오 ID (없으면 URL)
+
+        transient=False(정상 응답에 영상 없음)는 바로 영구 실패,
+        transient=True는 시도 횟수를 늘리고 max_attempts에 도달하면 영구 실패
+        """
+        now = datetime.now()
+        entry = self.entries.get(key, {})
+        attempts = entry.get('attempts', 0) + 1
+
+        status = 'transient' if transient else 'permanent'
+        if transient and attempts >= self.max_attempts:
+            status = 'permanent'
+            reason = f"{reason} (재시도 {attempts}회 초과)"
+
+        delay = self.base_delay * 2 ** (attempts - 1)
+        self.entries[key] = {
+            'url': url,
+            'keyword': keyword,
+            'reason': reason,
+            'status': status,
+            'attempts': attempts,
+            'deferrals': entry.get('deferrals', 0),
+            'last_attempt_at': now.isoformat(),
+            'next_attempt_at': (now + timedelta(seconds=delay)).isoformat() if status == 'transient' else None
+        }
+        self.logger.info(f"재시도 큐 기록 ({status}, {attempts}회): {key} - {reason}")
+
+    def defer(self, key, url, keyword, reason, retry_at=None):
+        """요청 단위 오류로 미루기 - 시도 횟수는 그대로 (영구 실패로 바뀌지 않음)
+
+        retry_at(datetime)이 없으면 미룬 횟수에 따라 base_delay부터 2배씩, 최대 max_deferral까지 대기
+        """
+        now = datetime.now()
+        entry = self.entries.get(key, {})
+        deferrals = entry.get('deferrals', 0) + 1
+        if retry_at is None:
+            retry_at = now + timedelta(seconds=min(self.base_delay * 2 ** (deferrals - 1), self.max_deferral))
+
+        self.entries[key] = {
+            'url': url,
+            'keyword': keyword,
+            'reason': reason,
+            'status': 'transient',
+            'attempts': entry.get('attempts', 0),
+            'deferrals': deferrals,
+            'last_attempt_at': now.isoformat(),
+            'next_attempt_at': retry_at.isoformat()
+        }
+        self.logger.info(f"재시도 큐 연기 ({retry_at.isoformat(timespec='minutes')}까지): {key} - {reason}")
+
+    def record_success(self, key):
+        """수집 성공 시 큐에서 제거"""
+        if self.entries.pop(key, None) is not None:
+            self.logger.info(f"재시도 성공: {key}")
+
+    def discard(self, key):
+        """더 이상 수집 대상이 아닌 항목(필터 제외 등)을 큐에서 제거"""
+        if self.entries.pop(key, None) is not None:
+            self.logger.info(f"재시도 큐에서 제거: {key}")
+
+    def is_permanent(self, key):
+        """영구 실패로 기록된 항목인지 확인"""
+        entry = self.entries.get(key)
+        return entry is not None and entry['status'] == 'permanent'
+
+    def due(self, limit=None, now=None):
+        """재시도 시각이 된 일시 실패 항목 목록 (오래 기다린 순)"""
+        now = (now or datetime.now()).isoformat()
+        due = [
+            {'url': entry['url'], 'keyword': entry['keyword']}
+            for _, entry in sorted(self.entries.items(), key=lambda item: item[1]['next_attempt_at'] or '')
+            if entry['status'] == 'transient' and entry['next_attempt_at'] <= now
+        ]
+        return due[:limit] if limit else due
+
+    def stats(self):
+        """상태별 항목 수"""
+        counts = {'transient': 0, 'permanent': 0}
+        for entry in self.entries.values():
+            counts[entry['status']] += 1
+        return counts
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+데몬 모드용 작업 스케줄러
+
+- 작업마다 실행 간격과 무작위 지연(jitter)을 두어 API 호출을 고르게 분산
+- 남은 API 할당량이 부족하면 할당량 초기화 시각까지 실행을 미룸
+- 작업 상태를 상태 파일(JSON)에 기록하여 외부에서 확인 가능
+- 계속 실행해도 소용없는 오류(fatal_errors, 예: API 키 오류)가 나면 스케줄러 전체를 종료
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+
+
+class Job:
+    def __init__(self, name, func, interval, jitter=0.1, quota_cost=None):
+        self.name = name
+        self.func = func
+        self.interval = interval  # 실행 간격 (초)
+        self.jitter = jitter  # 간격 대비 최대 무작위 지연 비율
+        self.quota_cost = quota_cost or (lambda: 0)  # 예상 API 할당량 (units)
+        self.next_run = time.time()
+        self.last_run = None
+        self.last_status = None
+        self.last_duration = None
+        self.runs = 0
+        self.errors = 0
+
+    def schedule_next(self, delay=None):
+        """다음 실행 시각 설정 (지정하지 않으면 실행 간격 + 무작위 지연)"""
+        if delay is None:
+            delay = self.interval + random.uniform(0, self.interval * self.jitter)
+        self.next_run = time.time() + delay
+
+    def to_dict(self):
+        return {
+            'interval_seconds': self.interval,
+            'next_run': datetime.fromtimestamp(self.next_run).isoformat(timespec='seconds'),
+            'last_run': datetime.fromtimestamp(self.last_run).isoformat(timespec='seconds') if self.last_run else None,
+            'last_status': self.last_status,
+            'last_duration_seconds': round(self.last_duration, 2) if self.last_duration is not None else None,
+            'runs': self.runs,
+            'errors': self.errors
+        }
+
+
+class JobScheduler:
+    def __init__(self, status_file="daemon_status.json", quota_remaining=None, quota_reset_at=None,
+                 quota_reserve=200, fatal_errors=(), logger=None):
+        self.status_file = status_file
+        self.quota_remaining = quota_remaining  # 남은 할당량을 반환하는 함수
+        self.quota_reset_at = quota_reset_at  # 다음 할당량 초기화 시각(timestamp)을 반환하는 함수
+        self.quota_reserve = quota_reserve  # 항상 남겨둘 여유 할당량
+        self.fatal_errors = tuple(fatal_errors)  # 발생하면 모든 작업을 멈출 예외 종류
+        self.fatal_error = None
+        self.logger = logger or logging.getLogger(__name__)
+        self.jobs = []
+        self.stop_event = threading.Event()
+        self.started_at = None
+
+    def add_job(self, name, func, interval, jitter=0.1, quota_cost=None, run_immediately=True):
+        """작업 등록"""
+        job = Job(name, func, interval, jitter, quota_cost)
+        if not run_immediately:
+            job.schedule_next()
+        self.jobs.append(job)
+        return job
+
+    def stop(self):
+        """스케줄러 종료 요청"""
+        self.stop_event.set()
+
+    def run_forever(self):
+        """종료 요청이 있을 때까지 작업 실행"""
+        self.started_at = time.time()
+        self.logger.info(f"데몬 시작: {[job.name for job in self.jobs]}")
+        self.write_status()
+
+        while not self.stop_event.is_set():
+            # 다음 실행 시각이 가장 빠른 작업
+            job = min(self.jobs, key=lambda item: item.next_run)
+            wait = job.next_run - time.time()
+            if wait > 0:
+                self.stop_event.wait(wait)
+                continue
+            self.run_job(job)
+            self.write_status()
+
+        self.logger.info("데몬 종료")
+        self.write_status()
+
+    def run_job(self, job):
+        """작업 1회 실행 (할당량 부족 시 연기)"""
+        cost = job.quota_cost()
+        if self.quota_remaining and cost and self.quota_remaining() - cost < self.quota_reserve:
+            # 할당량 초기화 시각과 다음 실행 시각 중 빠른 쪽으로 연기
+            delay = job.interval
+            if self.quota_reset_at:
+                delay = min(delay, max(self.quota_reset_at() - time.time(), 0) + random.uniform(0, 60))
+            job.schedule_next(delay)
+            job.last_status = f"deferred (필요 {cost} units, 남은 할당량 {self.quota_remaining()})"
+            self.logger.info(f"작업 연기: {job.name} - {job.last_status}")
+            return
+
+        started = time.time()
+        try:
+            self.logger.info(f"작업 시작: {job.name}")
+            job.func()
+            job.last_status = 'ok'
+        except self.fatal_errors as e:
+            # 다른 작업도 같은 이유로 실패하므로 더 실행하지 않고 종료
+            job.errors += 1
+            job.last_status = f"fatal: {e}"
+            self.fatal_error = e
+            self.logger.error(f"작업 실패 ({job.name}), 데몬을 종료합니다: {e}")
+            self.stop()
+        except Exception as e:
+            job.errors += 1
+            job.last_status = f"error: {e}"
+            self.logger.error(f"작업 실패 ({job.name}): {e}")
+        finally:
+            job.runs += 1
+            job.last_run = started
+            job.last_duration = time.time() - started
+            job.schedule_next()
+
+    def write_status(self):
+        """상태 파일 기록"""
+        status = {
+            'running': not self.stop_event.is_set(),
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds') if self.started_at else None,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'quota_remaining': self.quota_remaining() if self.quota_remaining else None,
+            'jobs': {job.name: job.to_dict() for job in self.jobs}
+        }
+        try:
+            with open(self.status_file, 'w', encoding='utf-8') as f:
+                json.dump(status, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.error(f"데몬 상태 기록 실패: {e}")
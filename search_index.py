@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+수집 데이터 전문 검색 인덱스 (SQLite FTS5)
+
+- 제목, 설명, 태그, 자막, 댓글 텍스트를 로컬 인덱스에 저장
+- 영상 수집 직후 영상 단위로 증분 갱신
+- 원문은 일반 테이블(영상 ID/키워드 인덱스)에, 전문 검색은 외부 콘텐츠 FTS5 테이블에 저장
+  → 영상 단위 교체와 키워드 필터가 전체 테이블을 훑지 않음
+- FTS5를 쓸 수 없는 SQLite에서는 검색 인덱스 없이 수집만 진행
+- 한국어는 띄어쓰기 단위 토큰화가 맞지 않으므로 trigram 토크나이저 사용
+  (3글자 미만 검색어는 일반 문자열 검색으로 처리)
+"""
+
+import logging
+import sqlite3
+
+# 인덱스에 넣는 영상 필드 (댓글은 별도로 한 건씩 저장)
+INDEXED_FIELDS = ('title', 'description', 'tags', 'transcript')
+
+
+class SearchIndex:
+    def __init__(self, db_file="search_index.db", logger=None):
+        self.db_file = db_file
+        self.logger = logger or logging.getLogger(__name__)
+        self.conn = sqlite3.connect(db_file)
+        self.tokenizer = self.create_tables()
+        # FTS5가 없는 SQLite에서는 인덱싱/검색 없이 수집만 진행
+        self.enabled = self.tokenizer is not None
+
+    def create_tables(self):
+        """검색 테이블 생성 - 사용한 토크나이저 반환 (FTS5를 쓸 수 없으면 None)
+
+        - search_rows: 원문과 영상 ID/키워드/항목 (일반 테이블, 영상 ID·키워드 인덱스)
+        - search_text: search_rows를 내용으로 쓰는 외부 콘텐츠 FTS5 테이블 (트리거로 동기화)
+        """
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS search_rows (
+                id INTEGER PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                keyword TEXT,
+                field TEXT,
+                author TEXT,
+                text TEXT
+            );
+            CREATE INDEX IF NOT EXISTS search_rows_video ON search_rows (video_id);
+            CREATE INDEX IF NOT EXISTS search_rows_keyword ON search_rows (keyword, field);
+        """)
+
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                self.conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS search_text USING fts5(
+                        text,
+                        content='search_rows',
+                        content_rowid='id',
+                        tokenize='{tokenizer}'
+                    )
+                """)
+                break
+            except sqlite3.OperationalError as e:
+                self.logger.warning(f"FTS5 토크나이저 사용 불가 ({tokenizer}): {e}")
+        else:
+            self.logger.warning("SQLite FTS5를 사용할 수 없어 검색 인덱스를 만들지 않습니다.")
+            return None
+
+        self.conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS search_rows_insert AFTER INSERT ON search_rows BEGIN
+                INSERT INTO search_text (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS search_rows_delete AFTER DELETE ON search_rows BEGIN
+                INSERT INTO search_text (search_text, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+        """)
+
+        # 이미 만들어진 테이블의 토크나이저 확인
+        sql = self.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'search_text'").fetchone()[0]
+        return 'trigram' if 'trigram' in sql else 'unicode61'
+
+    def index_video(self, video):
+        """영상 1개 인덱싱 (기존 항목은 교체) - 커밋은 commit()에서
+
+        중단 후 재실행 등으로 이미 들어 있는 영상도 중복되지 않도록 항상 삭제 후 추가
+        (영상 ID 인덱스로 찾으므로 인덱스에 없는 영상이면 비용이 거의 없음)
+        """
+        if not self.enabled:
+            return
+        video_id = video.video_id
+        keyword = video.keyword
+
+        rows = [
+            (video_id, keyword, field, '', getattr(video, field))
+            for field in INDEXED_FIELDS if getattr(video, field)
+        ]
+        rows.extend(
+            (video_id, keyword, 'comment', comment.author, comment.text)
+            for comment in video.comments
+        )
+
+        self.conn.execute("DELETE FROM search_rows WHERE video_id = ?", (video_id,))
+        self.conn.executemany(
+            "INSERT INTO search_rows (video_id, keyword, field, author, text) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def rebuild(self, videos):
+        """전체 인덱스 재생성"""
+        if not self.enabled:
+            return
+        self.conn.execute("DELETE FROM search_rows")
+        self.conn.execute("INSERT INTO search_text (search_text) VALUES ('delete-all')")
+        for video in videos:
+            self.index_video(video)
+        self.commit()
+
+    def commit(self):
+        """변경 사항 저장"""
+        try:
+            self.conn.commit()
+        except Exception as e:
+            self.logger.error(f"검색 인덱스 저장 실패: {e}")
+
+    def search(self, query, keyword=None, field=None, limit=20):
+        """문구 검색 - (video_id, keyword, field, author, 일치 부분) 목록 반환"""
+        if not self.enabled:
+            return []
+        filters = []
+        params = []
+
+        # trigram은 3글자 이상만 색인 검색 가능, 짧은 검색어는 문자열 검색
+        # (trigram 테이블에서 3글자 미만 LIKE 패턴은 결과가 없으므로 instr 사용)
+        if self.tokenizer == 'trigram' and len(query) < 3:
+            source = "search_rows AS r"
+            filters.append("instr(r.text, ?) > 0")
+            params.append(query)
+            snippet = "substr(r.text, max(instr(r.text, ?) - 20, 1), 60)"
+            snippet_params = [query]
+            order = ""
+        else:
+            source = "search_text JOIN search_rows AS r ON r.id = search_text.rowid"
+            filters.append("search_text MATCH ?")
+            params.append('text : "' + query.replace('"', '""') + '"')
+            snippet = "snippet(search_text, 0, '[', ']', '…', 16)"
+            snippet_params = []
+            order = "ORDER BY rank"
+
+        # 키워드/항목 조건은 search_rows 인덱스 사용
+        if keyword:
+            filters.append("r.keyword = ?")
+            params.append(keyword)
+        if field:
+            filters.append("r.field = ?")
+            params.append(field)
+
+        sql = (
+            f"SELECT r.video_id, r.keyword, r.field, r.author, {snippet} FROM {source} "
+            f"WHERE {' AND '.join(filters)} {order} LIMIT ?"
+        )
+        return self.conn.execute(sql, snippet_params + params + [limit]).fetchall()
+
+    def close(self):
+        """연결 종료"""
+        self.commit()
+        self.conn.close()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+YouTube Shorts 수집기 공통 모듈 (v1 대화형 / v2 배치 수집기가 함께 사용)
+
+- URL에서 영상 ID 추출, API 응답을 Video/Comment/Channel 레코드로 변환
+- 조회 방식(fetch backend)을 바꿔 끼울 수 있는 인터페이스
+  - serial: 영상/채널 1개당 요청 1번 (이전 방식)
+  - batch: videos/channels는 ID를 최대 50개씩 묶고, 댓글은 배치 HTTP 요청으로 묶음
+  - concurrent: batch 묶음 여러 개를 스레드 풀에서 동시에 요청
+    (묶음이 하나뿐이어도 댓글 배치를 나눠 보내고, 댓글/채널 조회를 겹쳐 실행)
+- API 오류 분류 (할당량 소진 / 잘못된 키)
+- 조회 경로의 성능 개선은 이 모듈에서만 하면 두 수집기에 모두 적용됨
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from records import Video, Comment, Channel
+
+VIDEO_PARTS = 'snippet,statistics,contentDetails'
+
+URL_PATTERNS = [
+    re.compile(r'(?:youtube\.com/shorts/)([^&\n?#]+)'),
+    re.compile(r'(?:youtube\.com/watch\?v=)([^&\n?#]+)'),
+    re.compile(r'(?:youtu\.be/)([^&\n?#]+)')
+]
+
+
+def extract_video_id(url):
+    """YouTube URL에서 비디오 ID 추출"""
+    for pattern in URL_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def build_client(api_key):
+    """YouTube API 클라이언트 생성 (라이브러리에 포함된 discovery 문서 사용, 네트워크 요청 없음)"""
+    from googleapiclient.discovery import build
+
+    try:
+        return build('youtube', 'v3', developerKey=api_key, static_discovery=True, cache_discovery=False)
+    except TypeError:
+        # static_discovery 옵션이 없는 구버전 라이브러리
+        return build('youtube', 'v3', developerKey=api_key, cache_discovery=False)
+
+
+# 하루 할당량 소진 오류 사유 (할당량 초기화 전에는 재시도해도 같은 결과)
+QUOTA_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+
+def error_text(exception):
+    content = getattr(exception, 'content', b'')
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='ignore')
+    return f"{exception} {content}"
+
+
+def is_quota_error(exception):
+    """예외가 하루 할당량 소진 때문인지 판단"""
+    status = getattr(getattr(exception, 'resp', None), 'status', None)
+    return status is not None and int(status) == 403 and \
+        any(reason in error_text(exception) for reason in QUOTA_REASONS)
+
+
+# API 키 자체가 잘못되었을 때의 오류 사유 (재시도해도 같은 결과)
+KEY_ERROR_REASONS = ('keyInvalid', 'API_KEY_INVALID', 'API key not valid', 'keyExpired', 'API key expired')
+
+
+def is_key_error(exception):
+    """예외가 잘못된/만료된 API 키 때문인지 판단"""
+    status = getattr(getattr(exception, 'resp', None), 'status', None)
+    if status is None or int(status) not in (400, 403):
+        return False
+    return any(reason in error_text(exception) for reason in KEY_ERROR_REASONS)
+
+
+def parse_comments(response):
+    """commentThreads.list 응답에서 댓글 목록 추출"""
+    comments = []
+    for item in response['items']:
+        comment = item['snippet']['topLevelComment']['snippet']
+        comments.append(Comment(
+            author=comment['authorDisplayName'],
+            text=comment['textDisplay'],
+            like_count=comment['likeCount'],
+            published_at=comment['publishedAt']
+        ))
+    return comments
+
+
+def parse_video(item, keyword='', comments=None, channel=None):
+    """videos.list 항목을 Video 레코드로 변환"""
+    snippet = item['snippet']
+    statistics = item['statistics']
+    return Video(
+        video_id=item['id'],
+        keyword=keyword or '',
+        title=snippet.get('title', ''),
+        description=snippet.get('description', ''),
+        channel_title=snippet.get('channelTitle', ''),
+        published_at=snippet.get('publishedAt', ''),
+        view_count=int(statistics.get('viewCount', 0)),
+        like_count=int(statistics.get('likeCount', 0)),
+        comment_count=int(statistics.get('commentCount', 0)),
+        duration=item['contentDetails'].get('duration', ''),
+        tags=', '.join(snippet.get('tags', [])),
+        category_id=snippet.get('categoryId', ''),
+        subscriber_count=channel.subscriber_count if channel else 0,
+        comments=comments
+    )
+
+
+class FetchBackend:
+    """videos / commentThreads / channels 조회 방식 (하위 클래스에서 조회 단위를 정함)"""
+
+    def __init__(self, youtube, batch_size=50, api_call_delay=0.0, count_quota=None, max_workers=4, logger=None):
+        self.youtube = youtube
+        self.batch_size = batch_size  # 요청 1번에 묶을 최대 ID 수
+        self.api_call_delay = api_call_delay  # Rate Limiting: 요청 전 대기 (초)
+        self.count_quota = count_quota or (lambda units=1: None)
+        self.max_workers = max_workers
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = threading.Lock()
+
+    def chunks(self, ids, size=None):
+        size = size or self.batch_size
+        return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+    def comment_chunks(self, ids):
+        """댓글 배치 요청 단위 (할당량은 영상 수만큼 들므로 나눠도 같음)"""
+        return self.chunks(ids)
+
+    def map(self, func, chunks):
+        """묶음별 조회 실행 (기본: 순서대로)"""
+        return [func(chunk) for chunk in chunks]
+
+    def execute(self, request, units=1):
+        """요청 1번 실행 (대기 + 할당량 기록)"""
+        time.sleep(self.api_call_delay)
+        with self.lock:
+            self.count_quota(units)
+        return request.execute()
+
+    def comment_threads_request(self, video_id, max_comments=20):
+        """commentThreads.list 요청 객체 생성"""
+        return self.youtube.commentThreads().list(
+            part='snippet',
+            videoId=video_id,
+            maxResults=max_comments,
+            order='relevance'
+        )
+
+    def fetch_videos(self, video_ids, part=VIDEO_PARTS):
+        """videos.list 조회 - ({video_id: 항목}, {video_id: 예외})"""
+        items, errors = {}, {}
+
+        def fetch(chunk):
+            try:
+                response = self.execute(self.youtube.videos().list(part=part, id=','.join(chunk)))
+                for item in response['items']:
+                    items[item['id']] = item
+            except Exception as e:
+                self.logger.error(f"비디오 기본 정보 조회 오류 ({', '.join(chunk)}): {e}")
+                for video_id in chunk:
+                    errors[video_id] = e
+
+        self.map(fetch, self.chunks(list(video_ids)))
+        return items, errors
+
+    def fetch_comments(self, video_ids, max_comments=20):
+        """댓글 조회 - {video_id: 댓글 목록} (실패한 영상은 빈 목록)"""
+        comments_by_id = {video_id: [] for video_id in video_ids}
+
+        def on_response(request_id, response, exception):
+            # 개별 요청 실패는 해당 영상만 빈 댓글로 처리
+            if exception is not None:
+                self.logger.info(f"댓글 수집 불가 ({request_id}): {str(exception)}")
+                return
+            try:
+                comments_by_id[request_id] = parse_comments(response)
+            except Exception as e:
+                self.logger.info(f"댓글 파싱 실패 ({request_id}): {str(e)}")
+
+        def fetch(chunk):
+            batch = self.youtube.new_batch_http_request(callback=on_response)
+            for video_id in chunk:
+                batch.add(self.comment_threads_request(video_id, max_comments), request_id=video_id)
+            try:
+                # 배치 요청도 할당량은 개별 요청 수만큼 소모
+                self.execute(batch, units=len(chunk))
+            except Exception as e:
+                self.logger.error(f"댓글 배치 요청 오류 ({len(chunk)}개): {e}")
+
+        self.map(fetch, self.comment_chunks(list(video_ids)))
+        return comments_by_id
+
+    def fetch_channels(self, channel_ids):
+        """channels.list 조회 - {channel_id: Channel} (조회 실패한 채널은 구독자 0)"""
+        channels = {channel_id: Channel(channel_id) for channel_id in channel_ids}
+
+        def fetch(chunk):
+            try:
+                response = self.execute(self.youtube.channels().list(part='statistics', id=','.join(chunk)))
+                for item in response['items']:
+                    channels[item['id']] = Channel(item['id'], int(item['statistics'].get('subscriberCount', 0)))
+            except Exception as e:
+                self.logger.error(f"채널 정보 조회 오류 ({len(chunk)}개): {e}")
+
+        self.map(fetch, self.chunks(list(channels)))
+        return channels
+
+    def fetch_details(self, comment_ids, channel_ids, max_comments=20):
+        """댓글 + 채널 조회 - ({video_id: 댓글 목록}, {channel_id: Channel})"""
+        comments_by_id = self.fetch_comments(comment_ids, max_comments) if comment_ids else {}
+        channels = self.fetch_channels(channel_ids) if channel_ids else {}
+        return comments_by_id, channels
+
+    def get_videos(self, video_ids, keyword='', max_comments=20):
+        """기본 정보 + 댓글 + 구독자 수까지 조회 - ({video_id: Video}, {video_id: 예외})"""
+        items, errors = self.fetch_videos(video_ids)
+        # 댓글 비활성화 영상은 댓글 요청 생략
+        comments_by_id, channels = self.fetch_details(
+            [video_id for video_id, item in items.items() if 'commentCount' in item['statistics']],
+            list({item['snippet']['channelId'] for item in items.values()}),
+            max_comments
+        )
+        videos = {
+            video_id: parse_video(
+                item, keyword, comments_by_id.get(video_id, []), channels.get(item['snippet']['channelId'])
+            )
+            for video_id, item in items.items()
+        }
+        return videos, errors
+
+
+class SerialBackend(FetchBackend):
+    """ID 1개당 요청 1번 (댓글도 영상별 개별 요청)"""
+
+    def __init__(self, youtube, **options):
+        super().__init__(youtube, **options)
+        self.batch_size = 1
+
+    def fetch_comments(self, video_ids, max_comments=20):
+        comments_by_id = {}
+        for video_id in video_ids:
+            try:
+                response = self.execute(self.comment_threads_request(video_id, max_comments))
+                comments_by_id[video_id] = parse_comments(response)
+            except Exception as e:
+                self.logger.info(f"댓글 수집 불가 ({video_id}): {str(e)}")
+                comments_by_id[video_id] = []
+        return comments_by_id
+
+
+class BatchBackend(FetchBackend):
+    """ID를 묶어 조회 (videos/channels: 쉼표로 묶은 ID, 댓글: 배치 HTTP 요청)"""
+
+
+class ConcurrentBackend(FetchBackend):
+    """묶음 여러 개를 스레드 풀에서 동시에 조회 (스레드마다 별도 HTTP 연결)"""
+
+    def __init__(self, youtube, **options):
+        super().__init__(youtube, **options)
+        self.local = threading.local()
+
+    def map(self, func, chunks):
+        if len(chunks) <= 1:
+            return [func(chunk) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(func, chunks))
+
+    def comment_chunks(self, ids):
+        # 수집기는 한 번에 batch_size개씩 넘기므로, 댓글 배치를 스레드 수만큼 나눠 동시에 요청
+        size = max(-(-len(ids) // self.max_workers), 1)
+        return self.chunks(ids, min(size, self.batch_size))
+
+    def fetch_details(self, comment_ids, channel_ids, max_comments=20):
+        # 댓글 배치와 채널 조회는 서로 독립적이므로 겹쳐 실행
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            comments = pool.submit(
+                lambda: self.fetch_comments(comment_ids, max_comments) if comment_ids else {}
+            )
+            channels = pool.submit(lambda: self.fetch_channels(channel_ids) if channel_ids else {})
+            return comments.result(), channels.result()
+
+    def execute(self, request, units=1):
+        # httplib2 연결은 스레드 간에 공유할 수 없으므로 스레드별로 생성
+        http = getattr(self.local, 'http', None)
+        if http is None:
+            import httplib2
+            http = self.local.http = httplib2.Http(timeout=30)
+        time.sleep(self.api_call_delay)
+        with self.lock:
+            self.count_quota(units)
+        return request.execute(http=http)
+
+
+BACKENDS = {
+    'serial': SerialBackend,
+    'batch': BatchBackend,
+    'concurrent': ConcurrentBackend,
+}
+
+
+def create_backend(name, youtube, **options):
+    """이름으로 조회 방식 생성 (serial / batch / concurrent)"""
+    return BACKENDS[name](youtube, **options)
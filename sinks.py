@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+수집 결과 백그라운드 저장 (Excel / JSON / 샤딩 JSONL)
+
+- 영상 수집이 끝날 때마다 크기 제한 큐에 넣고, 별도 스레드가 파일에 바로 기록
+- 수집이 끝나면 파일을 마무리하고 닫기만 하므로 저장 대기 시간이 거의 없음
+- 큐가 가득 차면 수집 쪽이 잠시 대기 (메모리 사용량 제한)
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+import os
+import queue
+import threading
+
+from openpyxl import Workbook
+
+from jsonl_archive import JsonlArchiveWriter
+
+# 큐 종료 표시
+_STOP = object()
+
+
+def video_row(item):
+    """영상정보 시트 행"""
+    return {
+        '영상 ID': item.video_id,
+        '키워드': item.keyword,
+        '제목': item.title,
+        '채널명': item.channel_title,
+        '업로드 날짜': item.published_at,
+        '조회수': item.view_count,
+        '좋아요 수': item.like_count,
+        '댓글 수': item.comment_count,
+        '구독자 수': item.subscriber_count,
+        '태그': item.tags,
+        '설명': item.description,
+        '썸네일 파일명': item.thumbnail_filename
+    }
+
+
+def comment_rows(item):
+    """댓글정보 시트 행 목록"""
+    return [
+        {
+            '영상 ID': item.video_id,
+            '키워드': item.keyword,
+            '영상 제목': item.title,
+            '댓글 작성자': comment.author,
+            '댓글 내용': comment.text,
+            '댓글 좋아요': comment.like_count,
+            '댓글 작성일': comment.published_at
+        }
+        for comment in item.comments
+    ]
+
+
+def script_row(item):
+    """스크립트 시트 행 (자막이 없으면 None)"""
+    if not item.transcript:
+        return None
+    return {
+        '영상 ID': item.video_id,
+        '키워드': item.keyword,
+        '영상 제목': item.title,
+        '스크립트': item.transcript
+    }
+
+
+class BackgroundSink(threading.Thread, ABC):
+    """크기 제한 큐에서 영상을 꺼내 파일에 기록하는 writer 스레드
+
+    하위 클래스는 open/write/close를 모두 구현해야 함 (빠뜨리면 생성 시점에 TypeError)
+    """
+
+    def __init__(self, filename, queue_size=200, logger=None):
+        super().__init__(name=f"sink-{filename}", daemon=True)
+        self.filename = filename
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.logger = logger or logging.getLogger(__name__)
+        self.count = 0
+        self.error = None
+
+    def put(self, video):
+        """영상 1개 기록 요청 (큐가 가득 차면 대기)"""
+        self.queue.put(video)
+
+    def finish(self):
+        """남은 영상을 모두 기록하고 파일 닫기 - 성공 여부 반환"""
+        self.queue.put(_STOP)
+        self.join()
+        return self.error is None
+
+    def run(self):
+        try:
+            self.open()
+            while True:
+                video = self.queue.get()
+                if video is _STOP:
+                    break
+                self.write(video)
+                self.count += 1
+        except Exception as e:
+            self.error = e
+            self.logger.error(f"파일 기록 오류 ({self.filename}): {e}")
+            # 수집 쪽이 큐에서 막히지 않도록 남은 항목은 버림
+            while self.queue.get() is not _STOP:
+                pass
+        finally:
+            try:
+                self.close()
+            except Exception as e:
+                self.error = self.error or e
+                self.logger.error(f"파일 닫기 오류 ({self.filename}): {e}")
+
+    @abstractmethod
+    def open(self):
+        """파일 열기 (writer 스레드에서 호출)"""
+
+    @abstractmethod
+    def write(self, video):
+        """영상 1개 기록"""
+
+    @abstractmethod
+    def close(self):
+        """파일 마무리 후 닫기 (오류가 나도 항상 호출)"""
+
+
+class ExcelSink(BackgroundSink):
+    """Excel 파일 (openpyxl write-only 모드로 행 단위 기록)"""
+
+    def open(self):
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+
+    def append(self, sheet_name, row):
+        # 댓글/스크립트 시트는 데이터가 있을 때만 생성
+        sheet = self.sheets.get(sheet_name)
+        if sheet is None:
+            sheet = self.sheets[sheet_name] = self.workbook.create_sheet(sheet_name)
+            sheet.append(list(row.keys()))
+        sheet.append(list(row.values()))
+
+    def write(self, video):
+        self.append('영상정보', video_row(video))
+        for row in comment_rows(video):
+            self.append('댓글정보', row)
+        row = script_row(video)
+        if row:
+            self.append('스크립트', row)
+
+    def close(self):
+        if self.sheets:
+            self.workbook.save(self.filename)
+
+
+class JsonSink(BackgroundSink):
+    """JSON 배열 파일 (영상 단위로 이어 쓰기)"""
+
+    def open(self):
+        self.file = open(self.filename, 'w', encoding='utf-8')
+        self.file.write('[')
+
+    def write(self, video):
+        text = json.dumps(video.to_dict(), ensure_ascii=False, indent=2)
+        self.file.write((',\n' if self.count else '\n') + '\n'.join('  ' + line for line in text.split('\n')))
+
+    def close(self):
+        self.file.write('\n]\n')
+        self.file.close()
+        if not self.count:
+            os.remove(self.filename)
+
+
+class JsonlSink(BackgroundSink):
+    """샤딩/압축 JSONL 아카이브 (filename은 아카이브 폴더)"""
+
+    def __init__(self, filename, compression='gzip', shard_by='keyword', queue_size=200, logger=None):
+        super().__init__(filename, queue_size, logger)
+        self.compression = compression
+        self.shard_by = shard_by
+
+    def open(self):
+        self.writer = JsonlArchiveWriter(self.filename, self.compression, self.shard_by)
+
+    def write(self, video):
+        self.writer.write(video.to_dict())
+
+    def close(self):
+        self.writer.close()
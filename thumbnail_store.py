@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+내용 주소 방식 썸네일 저장소
+
+- 이미지 내용의 SHA-256 해시를 파일명으로 사용 (objects/ab/cd/<해시>.jpg)
+  → 한 폴더에 파일이 몰리지 않고, 같은 이미지(기본/대체 이미지 등)는 한 번만 저장
+- index.tsv 에 video_id → 해시를 추가 기록 (같은 영상이 여러 번 나오면 마지막 기록 사용)
+- 미리보기 등 크기별 파생 이미지는 프로세스 풀에서 수집과 동시에 생성 (Pillow 필요, 선택)
+"""
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+INDEX_FILE = "index.tsv"
+
+
+def make_derivative(src, dst, width, height):
+    """파생 이미지 1개 생성 (프로세스 풀 작업)"""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp = f"{dst}.tmp"
+    with Image.open(src) as image:
+        image.thumbnail((width, height))
+        image.convert('RGB').save(tmp, 'JPEG', quality=85)
+    os.replace(tmp, dst)
+    return dst
+
+
+class ThumbnailStore:
+    def __init__(self, root="thumbnails", derivative_sizes=(), max_workers=None, logger=None):
+        self.root = root
+        self.derivative_sizes = list(derivative_sizes)  # [(가로, 세로), ...]
+        self.max_workers = max_workers
+        self.logger = logger or logging.getLogger(__name__)
+        self.index = {}  # video_id -> 해시
+        self.index_file = None
+        self.pool = None
+        self.pending = {}  # 생성 중인 파생 이미지 경로 -> future
+        self.stored = 0
+        self.deduplicated = 0
+
+        index_path = os.path.join(root, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    video_id, digest = line.rstrip('\n').split('\t')
+                    self.index[video_id] = digest
+
+    def object_path(self, digest):
+        """원본 이미지 경로 (해시 앞 4자리로 2단계 폴더)"""
+        return os.path.join('objects', digest[:2], digest[2:4], f"{digest}.jpg")
+
+    def derivative_path(self, digest, width, height):
+        return os.path.join('derived', f"{width}x{height}", digest[:2], digest[2:4], f"{digest}.jpg")
+
+    def get(self, video_id):
+        """영상의 썸네일 경로 (저장소 기준 상대 경로, 없으면 None)"""
+        digest = self.index.get(video_id)
+        if digest is None:
+            return None
+        path = self.object_path(digest)
+        return path if os.path.exists(os.path.join(self.root, path)) else None
+
+    def put(self, video_id, data):
+        """이미지 저장 - 같은 내용이 이미 있으면 기록만 추가. 상대 경로 반환"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        full_path = os.path.join(self.root, path)
+
+        if os.path.exists(full_path):
+            self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            tmp_path = f"{full_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, full_path)
+            self.stored += 1
+
+        if self.index.get(video_id) != digest:
+            self.index[video_id] = digest
+            if self.index_file is None:
+                os.makedirs(self.root, exist_ok=True)
+                self.index_file = open(os.path.join(self.root, INDEX_FILE), 'a', encoding='utf-8')
+            self.index_file.write(f"{video_id}\t{digest}\n")
+
+        self.request_derivatives(digest)
+        return path
+
+    def request_derivatives(self, digest):
+        """없는 파생 이미지를 프로세스 풀에 요청"""
+        if not self.derivative_sizes:
+            return
+        if Image is None:
+            self.logger.warning("Pillow가 설치되지 않아 썸네일 미리보기를 만들지 않습니다. (pip install Pillow)")
+            self.derivative_sizes = []
+            return
+
+        src = os.path.join(self.root, self.object_path(digest))
+        for width, height in self.derivative_sizes:
+            dst = os.path.join(self.root, self.derivative_path(digest, width, height))
+            if dst in self.pending or os.path.exists(dst):
+                continue
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self.pool.submit(make_derivative, src, dst, width, height)
+            future.add_done_callback(self.derivative_done)
+            self.pending[dst] = future
+
+    def derivative_done(self, future):
+        error = future.exception()
+        if error is not None:
+            self.logger.error(f"썸네일 미리보기 생성 실패: {error}")
+
+    def flush(self):
+        if self.index_file is not None:
+            self.index_file.flush()
+        # 끝난 작업 정리
+        self.pending = {dst: future for dst, future in self.pending.items() if not future.done()}
+
+    def close(self):
+        """남은 파생 이미지 생성을 기다리고 파일 닫기"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+        self.pending = {}
+        if self.index_file is not None:
+            self.index_file.close()
+            self.index_file = None
+        if self.stored or self.deduplicated:
+            self.logger.info(f"썸네일 저장: 새 이미지 {self.stored}개, 중복 {self.deduplicated}개")
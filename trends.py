@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+조회수 증가 속도(트렌드) 분석
+
+- 수집/통계 갱신 때마다 영상별 조회수·좋아요·댓글 수 스냅샷을 고정 길이 바이너리 파일에 추가
+  (영상 ID/키워드는 번호로 저장하여 정렬·그룹 연산을 정수 배열로 처리)
+- 분석 시 파일 전체를 NumPy 배열로 한 번에 읽고, 영상/시각 순으로 정렬한 뒤
+  반복문 없이 배열 연산으로 시간당 조회수, 가속도, 좋아요 비율 변화를 계산
+- 키워드별 상위 급상승 영상도 정렬 한 번으로 순위를 매김 (수백만 행도 수 초 이내)
+"""
+
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+# 스냅샷 1행 (영상/키워드는 SnapshotStore의 번호)
+SNAPSHOT_DTYPE = np.dtype([
+    ('video', '<i4'),
+    ('keyword', '<i4'),
+    ('timestamp', '<i8'),
+    ('views', '<i8'),
+    ('likes', '<i8'),
+    ('comments', '<i8'),
+])
+
+TREND_DTYPE = np.dtype([
+    ('video', '<i4'),
+    ('keyword', '<i4'),
+    ('snapshots', '<i4'),
+    ('views', '<i8'),
+    ('velocity', '<f8'),  # 최근 구간 시간당 조회수
+    ('acceleration', '<f8'),  # 시간당 조회수 변화량 / 시간
+    ('like_ratio', '<f8'),
+    ('like_ratio_change', '<f8'),
+])
+
+
+class SnapshotStore:
+    def __init__(self, data_file="stats_snapshots.bin", videos_file="stats_videos.txt",
+                 keywords_file="stats_keywords.json", logger=None):
+        self.data_file = data_file
+        self.videos_file = videos_file  # 영상 번호 = 줄 번호 (추가만 함)
+        self.keywords_file = keywords_file
+        self.logger = logger or logging.getLogger(__name__)
+        self.video_ids = []
+        self.video_codes = {}
+        self.keywords = []
+        self.keyword_codes = {}
+        self.file = None
+        self.videos = None
+
+        if os.path.exists(videos_file):
+            with open(videos_file, 'r', encoding='utf-8') as f:
+                self.video_ids = f.read().split()
+            self.video_codes = {video_id: code for code, video_id in enumerate(self.video_ids)}
+        if os.path.exists(keywords_file):
+            with open(keywords_file, 'r', encoding='utf-8') as f:
+                self.keywords = json.load(f)
+            self.keyword_codes = {keyword: code for code, keyword in enumerate(self.keywords)}
+
+    def video_code(self, video_id):
+        """영상 번호 (처음 나온 영상은 목록 파일에 추가)"""
+        code = self.video_codes.get(video_id)
+        if code is None:
+            code = self.video_codes[video_id] = len(self.video_ids)
+            self.video_ids.append(video_id)
+            if self.videos is None:
+                self.videos = open(self.videos_file, 'a', encoding='utf-8')
+            self.videos.write(video_id + '\n')
+        return code
+
+    def keyword_code(self, keyword):
+        """키워드 번호 (처음 나온 키워드는 목록에 추가)"""
+        code = self.keyword_codes.get(keyword)
+        if code is None:
+            code = self.keyword_codes[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+            with open(self.keywords_file, 'w', encoding='utf-8') as f:
+                json.dump(self.keywords, f, ensure_ascii=False)
+        return code
+
+    def record(self, videos, timestamp=None):
+        """영상 목록의 현재 통계를 스냅샷으로 추가"""
+        if not videos:
+            return
+        rows = np.empty(len(videos), dtype=SNAPSHOT_DTYPE)
+        rows['video'] = [self.video_code(video.video_id) for video in videos]
+        rows['keyword'] = [self.keyword_code(video.keyword or '') for video in videos]
+        rows['timestamp'] = int(time.time() if timestamp is None else timestamp)
+        rows['views'] = [video.view_count for video in videos]
+        rows['likes'] = [video.like_count for video in videos]
+        rows['comments'] = [video.comment_count for video in videos]
+
+        if self.file is None:
+            self.file = open(self.data_file, 'ab')
+        self.file.write(rows.tobytes())
+
+    def flush(self):
+        # 영상 목록을 먼저 기록해야 스냅샷의 영상 번호가 항상 목록 안에 있음
+        for file in (self.videos, self.file):
+            if file is not None:
+                file.flush()
+
+    def close(self):
+        self.flush()
+        for file in (self.videos, self.file):
+            if file is not None:
+                file.close()
+        self.videos = self.file = None
+
+    def load(self, since=None):
+        """저장된 스냅샷 전체(또는 since 이후)를 배열로 읽기"""
+        self.flush()
+        if not os.path.exists(self.data_file):
+            return np.empty(0, dtype=SNAPSHOT_DTYPE)
+        snapshots = np.fromfile(self.data_file, dtype=SNAPSHOT_DTYPE)
+        if since is not None:
+            snapshots = snapshots[snapshots['timestamp'] >= since]
+        return snapshots
+
+
+def compute_trends(snapshots, min_interval_hours=1.0):
+    """영상별 최근 조회수 증가 속도/가속도/좋아요 비율 변화 계산
+
+    스냅샷 간격이 min_interval_hours보다 짧으면 그 간격으로 간주하여
+    몇 분 차이로 찍힌 스냅샷 때문에 속도가 튀지 않도록 함
+    """
+    if len(snapshots) == 0:
+        return np.empty(0, dtype=TREND_DTYPE)
+
+    # 영상별로 모으고 영상 안에서는 시각 순
+    snapshots = snapshots[np.lexsort((snapshots['timestamp'], snapshots['video']))]
+    video_codes = snapshots['video']
+    hours = snapshots['timestamp'] / 3600.0
+    views = snapshots['views'].astype(np.float64)
+    likes = snapshots['likes'].astype(np.float64)
+
+    # 영상별 마지막 스냅샷 위치와 스냅샷 수
+    last = np.flatnonzero(np.append(video_codes[1:] != video_codes[:-1], True))
+    counts = np.diff(np.append(-1, last))
+
+    # 인접한 스냅샷 사이 구간별 속도 (pair[i] = i-1 → i 구간)
+    interval = np.maximum(np.diff(hours, prepend=hours[0]), min_interval_hours)
+    velocity = np.diff(views, prepend=views[0]) / interval
+    with np.errstate(divide='ignore', invalid='ignore'):
+        like_ratio = np.where(views > 0, likes / views, 0.0)
+
+    trends = np.zeros(len(last), dtype=TREND_DTYPE)
+    trends['video'] = video_codes[last]
+    trends['keyword'] = snapshots['keyword'][last]
+    trends['snapshots'] = counts
+    trends['views'] = snapshots['views'][last]
+    trends['like_ratio'] = like_ratio[last]
+
+    # 스냅샷 2개 이상: 마지막 구간 속도, 좋아요 비율 변화
+    has_two = counts >= 2
+    last_two = last[has_two]
+    trends['velocity'][has_two] = velocity[last_two]
+    trends['like_ratio_change'][has_two] = like_ratio[last_two] - like_ratio[last_two - 1]
+
+    # 스냅샷 3개 이상: 직전 구간 대비 속도 변화 / 두 구간 중간점 사이 시간
+    has_three = counts >= 3
+    last_three = last[has_three]
+    span = np.maximum((hours[last_three] - hours[last_three - 2]) / 2, min_interval_hours)
+    trends['acceleration'][has_three] = (velocity[last_three] - velocity[last_three - 1]) / span
+
+    return trends
+
+
+def rank_top_movers(trends, top_n=10, sort_by='velocity'):
+    """키워드별 상위 top_n개 (sort_by 기준 내림차순) - 키워드 번호 순으로 정렬된 배열 반환"""
+    # 스냅샷이 1개뿐인 영상은 변화량을 알 수 없으므로 제외
+    trends = trends[trends['snapshots'] >= 2]
+    if len(trends) == 0:
+        return trends
+
+    order = np.lexsort((-trends[sort_by], trends['keyword']))
+    ranked = trends[order]
+
+    # 키워드 그룹 안에서의 순위 = 위치 - 그룹 시작 위치
+    keywords = ranked['keyword']
+    group_start = np.flatnonzero(np.append(True, keywords[1:] != keywords[:-1]))
+    group_sizes = np.diff(np.append(group_start, len(ranked)))
+    rank = np.arange(len(ranked)) - np.repeat(group_start, group_sizes)
+    return ranked[rank < top_n]
+
+
+def top_movers(store, top_n=10, keyword=None, window_hours=None, sort_by='velocity', min_interval_hours=1.0):
+    """키워드별 급상승 영상 목록 - {키워드: [영상 dict, ...]}"""
+    since = time.time() - window_hours * 3600 if window_hours else None
+    snapshots = store.load(since)
+    if keyword is not None:
+        code = store.keyword_codes.get(keyword)
+        if code is None:
+            return {}
+        snapshots = snapshots[snapshots['keyword'] == code]
+
+    ranked = rank_top_movers(compute_trends(snapshots, min_interval_hours), top_n, sort_by)
+
+    result = {}
+    for row in ranked:
+        result.setdefault(store.keywords[row['keyword']], []).append({
+            'video_id': store.video_ids[row['video']],
+            'views': int(row['views']),
+            'views_per_hour': round(float(row['velocity']), 1),
+            'acceleration': round(float(row['acceleration']), 2),
+            'like_ratio': round(float(row['like_ratio']), 4),
+            'like_ratio_change': round(float(row['like_ratio_change']), 4),
+            'snapshots': int(row['snapshots'])
+        })
+    return result
@@ -5,10 +5,10 @@ YouTube Shorts 데이터 수집기 - 초보자용
 사용법: 이 파일을 실행하고 안내에 따라 진행하세요.
 """
 
-import re
 import pandas as pd
 from datetime import datetime
 import json
+import logging
 
 try:
     from googleapiclient.discovery import build
@@ -19,10 +19,21 @@ except ImportError:
     input("계속하려면 Enter를 누르세요...")
     exit()
 
+from shorts_core import extract_video_id, build_client, create_backend, is_key_error
+
+# 조회 오류는 화면에 직접 안내하므로 공통 모듈의 로그는 화면 대신 로그 파일에만 기록
+logger = logging.getLogger('youtube_collector')
+_log_handler = logging.FileHandler('youtube_collector.log', encoding='utf-8', delay=True)
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+logger.addHandler(_log_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
 class YouTubeShortsCollector:
     def __init__(self):
         self.api_key = None
         self.youtube = None
+        self.backend = None
         self.results = []
     
     def setup_api_key(self):
@@ -44,17 +55,13 @@ class YouTubeShortsCollector:
                 continue
             
             try:
-                # API 키 테스트
-                youtube = build('youtube', 'v3', developerKey=api_key)
-                # 간단한 테스트 요청
-                test_response = youtube.videos().list(
-                    part='snippet',
-                    id='dQw4w9WgXcQ'  # 테스트용 비디오 ID
-                ).execute()
+                # 클라이언트 생성만 하고 키 확인은 첫 영상 조회 때 (테스트 요청으로 할당량을 쓰지 않음)
+                youtube = build_client(api_key)
                 
                 self.api_key = api_key
                 self.youtube = youtube
-                print("✅ API 키가 정상적으로 설정되었습니다!")
+                self.backend = create_backend('batch', youtube, logger=logger)
+                print("✅ API 키가 설정되었습니다! (첫 영상 조회 때 키를 확인합니다)")
                 break
                 
             except Exception as e:
@@ -62,104 +69,43 @@ class YouTubeShortsCollector:
                 print("💡 API 키를 다시 확인해주세요.")
                 continue
     
-    def extract_video_id(self, url):
-        """YouTube URL에서 비디오 ID 추출"""
-        patterns = [
-            r'(?:youtube\.com/shorts/)([^&\n?#]+)',
-            r'(?:youtube\.com/watch\?v=)([^&\n?#]+)',
-            r'(?:youtu\.be/)([^&\n?#]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
-    
     def get_video_info(self, video_id):
         """비디오 정보 수집"""
         try:
-            # 비디오 기본 정보
-            video_response = self.youtube.videos().list(
-                part='snippet,statistics,contentDetails',
-                id=video_id
-            ).execute()
-            
-            if not video_response['items']:
+            # 기본 정보, 댓글, 채널 정보 (공통 모듈의 조회 방식 사용)
+            videos, errors = self.backend.get_videos([video_id])
+            if video_id in errors:
+                raise errors[video_id]
+            video = videos.get(video_id)
+            if video is None:
                 return None
             
-            video = video_response['items'][0]
-            snippet = video['snippet']
-            statistics = video['statistics']
-            
-            # 댓글 수집
-            comments = self.get_comments(video_id)
-            
-            # 채널 정보
-            channel_info = self.get_channel_info(snippet['channelId'])
-            
             return {
                 'video_id': video_id,
-                'title': snippet.get('title', ''),
-                'description': snippet.get('description', '')[:500] + '...' if len(snippet.get('description', '')) > 500 else snippet.get('description', ''),
-                'channel_title': snippet.get('channelTitle', ''),
-                'published_at': snippet.get('publishedAt', ''),
-                'view_count': int(statistics.get('viewCount', 0)),
-                'like_count': int(statistics.get('likeCount', 0)),
-                'comment_count': int(statistics.get('commentCount', 0)),
-                'duration': video['contentDetails'].get('duration', ''),
-                'tags': ', '.join(snippet.get('tags', [])),
-                'category_id': snippet.get('categoryId', ''),
-                'subscriber_count': channel_info.get('subscriber_count', 0) if channel_info else 0,
-                'comments': comments
+                'title': video.title,
+                'description': video.description[:500] + '...' if len(video.description) > 500 else video.description,
+                'channel_title': video.channel_title,
+                'published_at': video.published_at,
+                'view_count': video.view_count,
+                'like_count': video.like_count,
+                'comment_count': video.comment_count,
+                'duration': video.duration,
+                'tags': video.tags,
+                'category_id': video.category_id,
+                'subscriber_count': video.subscriber_count,
+                'comments': [comment.to_dict() for comment in video.comments]
             }
             
         except Exception as e:
+            if is_key_error(e):
+                # 첫 실제 조회에서 키 오류가 확인되면 새 키를 받아 같은 영상을 다시 조회
+                print(f"❌ API 키 오류: {e}")
+                print("💡 API 키를 다시 확인해주세요.")
+                self.setup_api_key()
+                return self.get_video_info(video_id)
             print(f"❌ 비디오 정보 수집 오류: {e}")
             return None
     
-    def get_comments(self, video_id, max_comments=20):
-        """댓글 수집"""
-        comments = []
-        try:
-            response = self.youtube.commentThreads().list(
-                part='snippet',
-                videoId=video_id,
-                maxResults=max_comments,
-                order='relevance'
-            ).execute()
-            
-            for item in response['items']:
-                comment = item['snippet']['topLevelComment']['snippet']
-                comments.append({
-                    'author': comment['authorDisplayName'],
-                    'text': comment['textDisplay'],
-                    'like_count': comment['likeCount'],
-                    'published_at': comment['publishedAt']
-                })
-            
-        except Exception as e:
-            print(f"⚠️ 댓글 수집 중 오류 (건너뜀): {e}")
-        
-        return comments
-    
-    def get_channel_info(self, channel_id):
-        """채널 정보 수집"""
-        try:
-            response = self.youtube.channels().list(
-                part='statistics',
-                id=channel_id
-            ).execute()
-            
-            if response['items']:
-                stats = response['items'][0]['statistics']
-                return {
-                    'subscriber_count': int(stats.get('subscriberCount', 0))
-                }
-        except:
-            pass
-        return None
-    
     def collect_data(self):
         """데이터 수집 메인 함수"""
         print("\n" + "="*60)
@@ -178,7 +124,7 @@ class YouTubeShortsCollector:
                 print("❌ URL을 입력해주세요.")
                 continue
             
-            video_id = self.extract_video_id(url)
+            video_id = extract_video_id(url)
             if not video_id:
                 print("❌ 올바르지 않은 YouTube URL입니다.")
                 continue
@@ -16,14 +16,31 @@ YouTube Shorts 데이터 수집기 v2 - 배치 처리 버전
 
 import re
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import hashlib
+import io
 import json
 import os
 import time
 import logging
+import argparse
+import signal
 from pathlib import Path
 import requests
 
+from retry_queue import RetryQueue
+from search_index import SearchIndex
+from trends import SnapshotStore, top_movers
+from records import Video, dump_checkpoint, load_checkpoint
+from shorts_core import (
+    extract_video_id, build_client, parse_video, create_backend, is_quota_error, is_key_error
+)
+from scheduler import JobScheduler
+from profiler import StageProfiler
+from sinks import ExcelSink, JsonSink, JsonlSink, video_row, comment_rows, script_row
+from jsonl_archive import JsonlArchive, JsonlArchiveWriter, check_compression
+from thumbnail_store import ThumbnailStore
+
 try:
     from googleapiclient.discovery import build
     print("✅ Google API 라이브러리 로드 성공")
@@ -43,18 +60,165 @@ except ImportError:
     exit()
 
 
+# 데몬 모드 기본 설정 (daemon_config.json 으로 덮어쓰기 가능, 간격은 분 단위)
+DEFAULT_DAEMON_CONFIG = {
+    'csv_source': None,            # 주기적으로 동기화할 CSV 파일 경로 또는 URL
+    'csv_sync_minutes': 60,
+    'stats_refresh_minutes': 360,
+    'retry_minutes': 30,
+    'export_minutes': 1440,
+    'trends_minutes': 60,
+    'trends_file': 'trends_latest.json',
+    'jitter': 0.1,                 # 실행 간격 대비 최대 무작위 지연 비율
+    'quota_reserve': 200,          # 항상 남겨둘 여유 할당량 (units)
+    'status_file': 'daemon_status.json',
+}
+
+# YouTube API 할당량은 태평양 시간 자정에 초기화됨
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+except Exception:
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+# 수집 대상 필터 기본값 (eligibility_rules.json 으로 설정, None이면 검사 안 함 - 기본은 모두 끔)
+DEFAULT_ELIGIBILITY_RULES = {
+    'max_duration_seconds': None,     # 최대 길이 (초, 예: 180)
+    'min_views': None,                # 최소 조회수
+    'published_after': None,          # 업로드 날짜 하한 (예: '2024-01-01')
+    'skip_comments_disabled': False,  # 댓글 비활성화 영상 제외
+}
+
+
+def parse_published_after(value):
+    """업로드 날짜 하한을 시간대가 있는 datetime으로 변환 ('2024-01-01', '20240101', 20240101 등)"""
+    text = str(value).strip()
+    for parse in (datetime.fromisoformat, lambda item: datetime.strptime(item, '%Y%m%d')):
+        try:
+            threshold = parse(text.replace('Z', '+00:00'))
+            break
+        except ValueError:
+            continue
+    else:
+        raise ValueError(f"날짜 형식이 올바르지 않습니다: {value!r} (예: '2024-01-01')")
+    if threshold.tzinfo is None:
+        threshold = threshold.replace(tzinfo=timezone.utc)
+    return threshold
+
+
+def normalize_eligibility_rules(rules, logger):
+    """필터 규칙 검사/변환 - 잘못된 값은 경고 후 기본값(검사 안 함)으로 되돌림"""
+    normalized = dict(DEFAULT_ELIGIBILITY_RULES)
+    for name, value in rules.items():
+        if name not in DEFAULT_ELIGIBILITY_RULES:
+            logger.warning(f"알 수 없는 필터 규칙 무시: {name}")
+            continue
+        if value is None:
+            continue
+        try:
+            if name in ('max_duration_seconds', 'min_views'):
+                if isinstance(value, bool) or int(value) != value or value < 0:
+                    raise ValueError(f"0 이상의 정수여야 합니다: {value!r}")
+                normalized[name] = int(value)
+            elif name == 'published_after':
+                normalized[name] = parse_published_after(value)
+            else:
+                if not isinstance(value, bool):
+                    raise ValueError(f"true/false 여야 합니다: {value!r}")
+                normalized[name] = value
+        except (TypeError, ValueError) as e:
+            logger.warning(f"필터 규칙 '{name}' 무시: {e}")
+    return normalized
+
+
+def normalize_daemon_config(config, logger):
+    """데몬 설정 검사/변환 - 잘못된 값은 경고 후 기본값으로 되돌림"""
+    normalized = dict(DEFAULT_DAEMON_CONFIG)
+    for name, value in config.items():
+        if name not in DEFAULT_DAEMON_CONFIG:
+            logger.warning(f"알 수 없는 데몬 설정 무시: {name}")
+            print(f"⚠️ 알 수 없는 데몬 설정 무시: {name}")
+            continue
+        try:
+            if name.endswith('_minutes'):
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                    raise ValueError(f"0보다 큰 숫자여야 합니다: {value!r}")
+            elif name == 'jitter':
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                    raise ValueError(f"0 이상의 숫자여야 합니다: {value!r}")
+            elif name == 'quota_reserve':
+                if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                    raise ValueError(f"0 이상의 정수여야 합니다: {value!r}")
+            elif name == 'csv_source':
+                if value is not None and not isinstance(value, str):
+                    raise ValueError(f"문자열이어야 합니다: {value!r}")
+            elif not isinstance(value, str) or not value:
+                raise ValueError(f"파일 이름 문자열이어야 합니다: {value!r}")
+            normalized[name] = value
+        except ValueError as e:
+            logger.warning(f"데몬 설정 '{name}' 무시 (기본값 {DEFAULT_DAEMON_CONFIG[name]!r} 사용): {e}")
+            print(f"⚠️ 데몬 설정 '{name}' 무시 (기본값 사용): {e}")
+    return normalized
+
+
+class ApiKeyError(Exception):
+    """API 키가 유효하지 않아 수집을 계속할 수 없음"""
+
+
+def parse_iso8601_duration(duration):
+    """ISO-8601 길이 문자열(PT1M5S)을 초 단위로 변환"""
+    match = re.match(
+        r'^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$',
+        duration or ''
+    )
+    if not match:
+        return None
+    days, hours, minutes, seconds = (int(value or 0) for value in match.groups())
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+
 class YouTubeShortsCollectorV2:
     def __init__(self):
         self.api_key = None
         self.youtube = None
         self.results = []
         self.processed_ids = set()
-        self.failed_urls = []
-        self.progress_file = "progress.json"
+        self.failed_urls = {}  # 비디오 ID(잘못된 URL은 URL) -> 마지막 실패 기록 (성공하면 제거)
+        self.progress_file = "progress.pkl"
+        self.legacy_progress_file = "progress.json"  # 이전 버전 JSON 진행 상황 (불러오기만 지원)
         self.api_key_file = "api_key.txt"
+        self.key_status_file = "api_key_status.json"  # 키별 확인 결과 (키 대신 해시로 기록)
+        self.key_verified = False
+        self.fetch_backend = 'batch'  # 조회 방식: serial / batch / concurrent
+        self.backend = None
         self.thumbnail_dir = "thumbnails"
+        self.eligibility_file = "eligibility_rules.json"
+        self.skipped_videos = []
+        self.skipped_ids = set()
         self.setup_logging()
         self.api_call_delay = 0.5  # Rate limiting: 0.5초 대기
+        self.batch_size = 50  # 일괄 조회 1회당 최대 영상/요청 수
+        self.json_export = True  # 결과 저장 시 사람이 읽을 수 있는 JSON 백업도 저장 (--no-json이면 생략)
+        self.jsonl_export = None  # 샤딩 JSONL 아카이브 압축 방식 ('gzip', 'zstd', None이면 저장 안 함)
+        self.jsonl_shard_by = 'keyword'  # 'keyword': 키워드별 샤드, 'size': 크기로만 분할
+        self.sheet_cache_dir = "sheet_cache"  # 원격 CSV 스냅샷 저장 폴더
+        self.full_sync = False  # True면 원격 CSV의 모든 행을 다시 처리
+        self.pending_snapshot = None
+        self.sinks = []  # 백그라운드 결과 저장 스레드
+        self.sink_timestamp = None
+        # HTTP 연결 재사용 (CSV/썸네일 다운로드)
+        self.http = requests.Session()
+        self.http.headers['User-Agent'] = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        self.eligibility_rules = self.load_eligibility_rules()
+        self.retry_queue = RetryQueue(logger=self.logger)
+        self.profiler = StageProfiler(logger=self.logger)  # --profile 옵션으로 활성화
+        self.search_index = SearchIndex(logger=self.logger)
+        self.trend_store = SnapshotStore(logger=self.logger)  # 조회수 추이 분석용 통계 스냅샷
+        self.thumbnail_store = ThumbnailStore(self.thumbnail_dir, logger=self.logger)
+        self.fetch_errors = {}  # 기본 정보 조회 중 오류가 난 비디오 ID -> 예외
+        self.daily_quota = 10000  # 하루 API 할당량 (units)
+        self.quota_used = 0
+        self.quota_day = None
 
     def setup_logging(self):
         """로깅 설정"""
@@ -66,6 +230,23 @@ class YouTubeShortsCollectorV2:
         )
         self.logger = logging.getLogger(__name__)
 
+    def load_eligibility_rules(self):
+        """수집 대상 필터 규칙 불러오기 (파일이 없으면 기본값 사용)"""
+        rules = {}
+        if os.path.exists(self.eligibility_file):
+            try:
+                with open(self.eligibility_file, 'r', encoding='utf-8') as f:
+                    rules = json.load(f)
+                if not isinstance(rules, dict):
+                    raise ValueError("JSON 객체 형식이어야 합니다.")
+            except Exception as e:
+                self.logger.error(f"필터 규칙 불러오기 실패: {e}")
+                rules = {}
+        rules = normalize_eligibility_rules(rules, self.logger)
+        if os.path.exists(self.eligibility_file):
+            self.logger.info(f"필터 규칙 불러오기 완료: {rules}")
+        return rules
+
     def load_api_key(self):
         """저장된 API 키 불러오기"""
         if os.path.exists(self.api_key_file):
@@ -85,6 +266,88 @@ class YouTubeShortsCollectorV2:
         except Exception as e:
             self.logger.error(f"API 키 저장 실패: {e}")
 
+    def connect(self, api_key):
+        """YouTube API 클라이언트 생성 (대화형 입력 없이)
+
+        라이브러리에 포함된 discovery 문서를 사용하므로 네트워크 요청/할당량 없이 생성되며,
+        키 확인은 첫 실제 API 호출 결과로 대신함
+        """
+        self.youtube = build_client(api_key)
+        self.backend = create_backend(
+            self.fetch_backend, self.youtube,
+            batch_size=self.batch_size,
+            api_call_delay=self.api_call_delay,
+            count_quota=self.count_quota,
+            logger=self.logger
+        )
+        self.api_key = api_key
+        self.key_verified = self.key_status(api_key) is True
+        self.logger.info("API 클라이언트 생성 완료")
+
+    def key_fingerprint(self, api_key):
+        """키 확인 결과 저장용 해시 (키 원문은 저장하지 않음)"""
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+    def load_key_statuses(self):
+        if os.path.exists(self.key_status_file):
+            try:
+                with open(self.key_status_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                self.logger.error(f"API 키 확인 기록 불러오기 실패: {e}")
+        return {}
+
+    def key_status(self, api_key):
+        """이전에 확인한 키 상태 - True(유효), False(무효), None(확인 전)"""
+        status = self.load_key_statuses().get(self.key_fingerprint(api_key))
+        return status['valid'] if status else None
+
+    def remember_key_status(self, valid, error=None):
+        """현재 키의 확인 결과 기록"""
+        statuses = self.load_key_statuses()
+        statuses[self.key_fingerprint(self.api_key)] = {
+            'valid': valid,
+            'checked_at': datetime.now().isoformat(timespec='seconds'),
+            'error': str(error) if error else None
+        }
+        try:
+            with open(self.key_status_file, 'w', encoding='utf-8') as f:
+                json.dump(statuses, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.logger.error(f"API 키 확인 기록 저장 실패: {e}")
+        self.key_verified = valid
+
+    def check_api_response(self, error=None):
+        """첫 실제 API 호출 결과로 키 확인 - 키 오류면 ApiKeyError"""
+        if error is None:
+            if not self.key_verified:
+                self.remember_key_status(True)
+                self.logger.info("API 키 확인 완료 (첫 API 호출 성공)")
+            return
+        if is_key_error(error):
+            self.remember_key_status(False, error)
+            self.logger.error(f"API 키 오류: {error}")
+            raise ApiKeyError(str(error)) from error
+
+    def count_quota(self, units=1):
+        """API 할당량 사용량 기록 (태평양 시간 자정에 초기화)"""
+        today = datetime.now(QUOTA_TIMEZONE).date()
+        if today != self.quota_day:
+            self.quota_day = today
+            self.quota_used = 0
+        self.quota_used += units
+
+    def quota_remaining(self):
+        """오늘 남은 API 할당량"""
+        self.count_quota(0)
+        return self.daily_quota - self.quota_used
+
+    def quota_reset_at(self):
+        """다음 할당량 초기화 시각 (timestamp)"""
+        now = datetime.now(QUOTA_TIMEZONE)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), QUOTA_TIMEZONE)
+        return midnight.timestamp()
+
     def setup_api_key(self):
         """API 키 설정"""
         print("\n" + "="*60)
@@ -98,22 +361,15 @@ class YouTubeShortsCollectorV2:
             use_saved = input("저장된 키를 사용하시겠습니까? (y/n): ").strip().lower()
 
             if use_saved == 'y':
-                try:
-                    # API 키 테스트
-                    youtube = build('youtube', 'v3', developerKey=saved_key)
-                    test_response = youtube.videos().list(
-                        part='snippet',
-                        id='dQw4w9WgXcQ'
-                    ).execute()
-
-                    self.api_key = saved_key
-                    self.youtube = youtube
+                if self.key_status(saved_key) is False:
+                    print("❌ 저장된 API 키는 이전 실행에서 유효하지 않은 것으로 확인되었습니다.")
+                    print("💡 새로운 API 키를 입력해주세요.")
+                else:
+                    # 키 확인은 첫 API 호출에서 (테스트 요청/할당량 사용 없음)
+                    self.connect(saved_key)
                     print("✅ 저장된 API 키로 설정 완료!")
                     self.logger.info("저장된 API 키 사용")
                     return
-                except Exception as e:
-                    print(f"❌ 저장된 API 키 오류: {e}")
-                    print("💡 새로운 API 키를 입력해주세요.")
 
         # 새 API 키 입력
         while True:
@@ -128,16 +384,13 @@ class YouTubeShortsCollectorV2:
                 print("💡 API 키는 'AIza'로 시작해야 합니다.")
                 continue
 
-            try:
-                # API 키 테스트
-                youtube = build('youtube', 'v3', developerKey=api_key)
-                test_response = youtube.videos().list(
-                    part='snippet',
-                    id='dQw4w9WgXcQ'
-                ).execute()
+            if self.key_status(api_key) is False:
+                print("❌ 이전 실행에서 유효하지 않은 것으로 확인된 API 키입니다.")
+                continue
 
-                self.api_key = api_key
-                self.youtube = youtube
+            try:
+                # 키 확인은 첫 API 호출에서 (테스트 요청/할당량 사용 없음)
+                self.connect(api_key)
 
                 # API 키 저장 여부 확인
                 save_choice = input("\n💾 이 API 키를 저장하시겠습니까? (y/n): ").strip().lower()
@@ -156,15 +409,24 @@ class YouTubeShortsCollectorV2:
                 self.logger.error(f"API 키 오류: {e}")
                 continue
 
+    def has_progress(self):
+        """저장된 진행 상황이 있는지 확인"""
+        return os.path.exists(self.progress_file) or os.path.exists(self.legacy_progress_file)
+
     def load_progress(self):
-        """진행 상황 불러오기"""
-        if os.path.exists(self.progress_file):
+        """진행 상황 불러오기 (바이너리 체크포인트 우선, 없으면 이전 JSON)"""
+        if self.has_progress():
             try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.results = data.get('results', [])
-                    self.processed_ids = set(data.get('processed_ids', []))
-                    self.failed_urls = data.get('failed_urls', [])
+                if os.path.exists(self.progress_file):
+                    self.results, data = load_checkpoint(self.progress_file)
+                else:
+                    with open(self.legacy_progress_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    self.results = [Video.from_dict(item) for item in data.get('results', [])]
+                self.processed_ids = set(data.get('processed_ids', []))
+                self.failed_urls = {
+                    extract_video_id(item['url']) or item['url']: item for item in data.get('failed_urls', [])
+                }
                 print(f"📂 이전 진행 상황을 불러왔습니다. (수집된 영상: {len(self.results)}개)")
                 self.logger.info(f"진행 상황 불러오기 완료: {len(self.results)}개")
                 return True
@@ -175,54 +437,44 @@ class YouTubeShortsCollectorV2:
 
     def save_progress(self):
         """진행 상황 저장"""
-        try:
-            data = {
-                'results': self.results,
-                'processed_ids': list(self.processed_ids),
-                'failed_urls': self.failed_urls,
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            self.logger.info(f"진행 상황 저장 완료: {len(self.results)}개")
-        except Exception as e:
-            print(f"⚠️ 진행 상황 저장 실패: {e}")
-            self.logger.error(f"진행 상황 저장 실패: {e}")
-
-    def extract_video_id(self, url):
-        """YouTube URL에서 비디오 ID 추출"""
-        patterns = [
-            r'(?:youtube\.com/shorts/)([^&\n?#]+)',
-            r'(?:youtube\.com/watch\?v=)([^&\n?#]+)',
-            r'(?:youtu\.be/)([^&\n?#]+)'
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
+        with self.profiler.stage('save_progress'):
+            try:
+                dump_checkpoint(
+                    self.progress_file,
+                    self.results,
+                    processed_ids=list(self.processed_ids),
+                    failed_urls=list(self.failed_urls.values()),
+                    last_updated=datetime.now().isoformat()
+                )
+                self.retry_queue.save()
+                self.search_index.commit()
+                self.trend_store.flush()
+                self.thumbnail_store.flush()
+                self.logger.info(f"진행 상황 저장 완료: {len(self.results)}개")
+            except Exception as e:
+                print(f"⚠️ 진행 상황 저장 실패: {e}")
+                self.logger.error(f"진행 상황 저장 실패: {e}")
 
     def download_thumbnail(self, video_id, thumbnail_url):
-        """썸네일 다운로드"""
+        """썸네일 다운로드 (내용 해시로 저장, 썸네일 폴더 기준 경로 반환)"""
         try:
-            # 썸네일 디렉토리 생성
-            Path(self.thumbnail_dir).mkdir(exist_ok=True)
-
-            # 파일명 생성
-            filename = f"{video_id}.jpg"
-            filepath = os.path.join(self.thumbnail_dir, filename)
-
             # 이미 다운로드된 경우 건너뛰기
-            if os.path.exists(filepath):
+            filename = self.thumbnail_store.get(video_id)
+            if filename:
+                return filename
+
+            # 이전 버전의 thumbnails/{영상ID}.jpg 는 저장소로 옮김
+            legacy_path = os.path.join(self.thumbnail_dir, f"{video_id}.jpg")
+            if os.path.exists(legacy_path):
+                with open(legacy_path, 'rb') as f:
+                    filename = self.thumbnail_store.put(video_id, f.read())
+                os.remove(legacy_path)
                 return filename
 
             # 썸네일 다운로드
-            response = requests.get(thumbnail_url, timeout=10)
+            response = self.http.get(thumbnail_url, timeout=10)
             if response.status_code == 200:
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-                return filename
+                return self.thumbnail_store.put(video_id, response.content)
             else:
                 self.logger.warning(f"썸네일 다운로드 실패: {video_id}")
                 return None
@@ -260,144 +512,186 @@ class YouTubeShortsCollectorV2:
             self.logger.info(f"자막 없음 ({video_id}): {str(e)}")
             return None
 
-    def get_video_info(self, video_id, keyword=None):
-        """비디오 정보 수집"""
-        try:
-            # Rate Limiting
-            time.sleep(self.api_call_delay)
+    def fetch_video_item(self, video_id):
+        """videos.list 기본 정보만 조회 (저비용 단계)"""
+        return self.fetch_video_items([video_id]).get(video_id)
+
+    def fetch_video_items(self, video_ids):
+        """videos.list 기본 정보 일괄 조회 (ID를 묶어 최대 50개씩) - {video_id: 항목}"""
+        items, errors = self.backend.fetch_videos(video_ids)
+        self.check_fetch_result(items, errors)
+        self.fetch_errors.update(errors)
+        return items
+
+    def check_fetch_result(self, items, errors):
+        """조회 결과로 키 확인 - 키 오류면 영상 실패로 기록하지 않고 중단 (ApiKeyError)"""
+        for error in set(errors.values()):
+            self.check_api_response(error)
+        if items:
+            self.check_api_response()
+
+    def check_eligibility(self, video):
+        """필터 규칙 검사 - 수집 대상이 아니면 제외 사유를, 대상이면 None 반환"""
+        rules = self.eligibility_rules
+        snippet = video.get('snippet', {})
+        statistics = video.get('statistics', {})
+
+        max_duration = rules.get('max_duration_seconds')
+        if max_duration is not None:
+            seconds = parse_iso8601_duration(video.get('contentDetails', {}).get('duration', ''))
+            if seconds is not None and seconds > max_duration:
+                return f"길이 초과 ({seconds}초 > {max_duration}초)"
+
+        min_views = rules.get('min_views')
+        if min_views:
+            view_count = int(statistics.get('viewCount', 0))
+            if view_count < min_views:
+                return f"조회수 미달 ({view_count:,} < {min_views:,})"
+
+        # load_eligibility_rules에서 시간대가 있는 datetime으로 변환됨
+        threshold = rules.get('published_after')
+        if threshold and snippet.get('publishedAt'):
+            try:
+                published = datetime.fromisoformat(snippet['publishedAt'].replace('Z', '+00:00'))
+                if published.tzinfo is None:
+                    published = published.replace(tzinfo=timezone.utc)
+                if published < threshold:
+                    return f"업로드 날짜 이전 ({snippet['publishedAt'][:10]} < {threshold.date()})"
+            except ValueError as e:
+                self.logger.warning(f"업로드 날짜 필터 검사 불가: {e}")
+
+        # 댓글이 비활성화된 영상은 statistics에 commentCount가 없음
+        if rules.get('skip_comments_disabled') and 'commentCount' not in statistics:
+            return "댓글 비활성화"
 
-            # 비디오 기본 정보
-            video_response = self.youtube.videos().list(
-                part='snippet,statistics,contentDetails',
-                id=video_id
-            ).execute()
+        return None
 
-            if not video_response['items']:
-                return None
+    def get_video_info(self, video_id, keyword=None, video=None, comments=None, channel_info=None):
+        """비디오 정보 수집 (video/comments/channel_info: 일괄 조회로 미리 가져온 값)"""
+        try:
+            # 비디오 기본 정보
+            if video is None:
+                video = self.fetch_video_item(video_id)
+                if video is None:
+                    return None
 
-            video = video_response['items'][0]
             snippet = video['snippet']
             statistics = video['statistics']
 
             # 썸네일 URL 및 다운로드
             thumbnails = snippet.get('thumbnails', {})
             thumbnail_url = thumbnails.get('medium', {}).get('url', '')
-            thumbnail_filename = self.download_thumbnail(video_id, thumbnail_url) if thumbnail_url else None
+            with self.profiler.stage('thumbnail'):
+                thumbnail_filename = self.download_thumbnail(video_id, thumbnail_url) if thumbnail_url else None
 
             # 자막 추출
-            transcript = self.get_transcript(video_id)
-
-            # Rate Limiting
-            time.sleep(self.api_call_delay)
-
-            # 댓글 수집
-            comments = self.get_comments(video_id)
+            with self.profiler.stage('transcript'):
+                transcript = self.get_transcript(video_id)
 
-            # Rate Limiting
-            time.sleep(self.api_call_delay)
+            # 댓글 수집 (댓글 비활성화 영상은 호출 생략)
+            if comments is None:
+                if 'commentCount' in statistics:
+                    comments = self.backend.fetch_comments([video_id])[video_id]
+                else:
+                    comments = []
 
             # 채널 정보
-            channel_info = self.get_channel_info(snippet['channelId'])
-
-            return {
-                'video_id': video_id,
-                'keyword': keyword or '',
-                'title': snippet.get('title', ''),
-                'description': snippet.get('description', ''),
-                'channel_title': snippet.get('channelTitle', ''),
-                'published_at': snippet.get('publishedAt', ''),
-                'view_count': int(statistics.get('viewCount', 0)),
-                'like_count': int(statistics.get('likeCount', 0)),
-                'comment_count': int(statistics.get('commentCount', 0)),
-                'duration': video['contentDetails'].get('duration', ''),
-                'tags': ', '.join(snippet.get('tags', [])),
-                'category_id': snippet.get('categoryId', ''),
-                'subscriber_count': channel_info.get('subscriber_count', 0) if channel_info else 0,
-                'thumbnail_filename': thumbnail_filename or '',
-                'transcript': transcript or '',
-                'comments': comments
-            }
+            if channel_info is None:
+                channel_id = snippet['channelId']
+                channel_info = self.backend.fetch_channels([channel_id])[channel_id]
+
+            video_info = parse_video(video, keyword, comments, channel_info)
+            video_info.thumbnail_filename = thumbnail_filename or ''
+            video_info.transcript = transcript or ''
+            return video_info
 
         except Exception as e:
             self.logger.error(f"비디오 정보 수집 오류 ({video_id}): {e}")
             return None
 
-    def get_comments(self, video_id, max_comments=20):
-        """댓글 수집"""
-        comments = []
-        try:
-            response = self.youtube.commentThreads().list(
-                part='snippet',
-                videoId=video_id,
-                maxResults=max_comments,
-                order='relevance'
-            ).execute()
-
-            for item in response['items']:
-                comment = item['snippet']['topLevelComment']['snippet']
-                comments.append({
-                    'author': comment['authorDisplayName'],
-                    'text': comment['textDisplay'],
-                    'like_count': comment['likeCount'],
-                    'published_at': comment['publishedAt']
-                })
+    def load_sheet_snapshot(self, csv_source):
+        """원격 CSV의 마지막 스냅샷 불러오기 (ETag, Last-Modified, 처리한 (키워드, URL) 목록)"""
+        snapshot_file = os.path.join(
+            self.sheet_cache_dir, hashlib.sha1(csv_source.encode('utf-8')).hexdigest() + '.json'
+        )
+        if os.path.exists(snapshot_file):
+            try:
+                with open(snapshot_file, 'r', encoding='utf-8') as f:
+                    return snapshot_file, json.load(f)
+            except Exception as e:
+                self.logger.error(f"시트 스냅샷 불러오기 실패: {e}")
+        return snapshot_file, {}
 
+    def commit_sheet_snapshot(self):
+        """수집을 마친 뒤 원격 CSV 스냅샷 저장 (중간에 중단되면 다음 실행에서 다시 처리)"""
+        if not self.pending_snapshot:
+            return
+        snapshot_file, snapshot = self.pending_snapshot
+        try:
+            Path(self.sheet_cache_dir).mkdir(exist_ok=True)
+            with open(snapshot_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            self.pending_snapshot = None
+            self.logger.info(f"시트 스냅샷 저장 완료: {snapshot['url']}")
         except Exception as e:
-            self.logger.info(f"댓글 수집 불가 ({video_id}): {str(e)}")
+            self.logger.error(f"시트 스냅샷 저장 실패: {e}")
+
+    def fetch_remote_csv(self, csv_source, snapshot):
+        """조건부 GET으로 원격 CSV 다운로드 - 변경이 없으면 None 반환"""
+        headers = {}
+        if snapshot.get('etag'):
+            headers['If-None-Match'] = snapshot['etag']
+        if snapshot.get('last_modified'):
+            headers['If-Modified-Since'] = snapshot['last_modified']
+
+        response = self.http.get(csv_source, headers=headers, timeout=30, allow_redirects=True)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
 
-        return comments
+        # 시트 서버가 ETag를 주지 않는 경우를 위해 내용 해시도 비교
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        snapshot['etag'] = response.headers.get('ETag')
+        snapshot['last_modified'] = response.headers.get('Last-Modified')
+        if snapshot.get('content_hash') == content_hash:
+            return None
+        snapshot['content_hash'] = content_hash
 
-    def get_channel_info(self, channel_id):
-        """채널 정보 수집"""
-        try:
-            response = self.youtube.channels().list(
-                part='statistics',
-                id=channel_id
-            ).execute()
-
-            if response['items']:
-                stats = response['items'][0]['statistics']
-                return {
-                    'subscriber_count': int(stats.get('subscriberCount', 0))
-                }
-        except Exception as e:
-            self.logger.error(f"채널 정보 수집 오류 ({channel_id}): {e}")
-        return None
+        response.encoding = 'utf-8'
+        return response.text
 
     def load_urls_from_csv(self, csv_source):
-        """CSV 파일 또는 URL에서 URL 목록 읽기"""
+        """CSV 파일 또는 URL에서 URL 목록 읽기 (원격 CSV는 새로 추가된 행만 반환)"""
         try:
+            snapshot = None
+
             # URL인지 파일 경로인지 확인
             if csv_source.startswith('http://') or csv_source.startswith('https://'):
                 print(f"\n🌐 웹에서 CSV 다운로드 중...")
 
-                # pandas가 URL을 직접 읽도록 (리다이렉트 자동 처리)
-                try:
-                    df = pd.read_csv(csv_source, on_bad_lines='skip', engine='python')
-                    print("✅ CSV 다운로드 성공!")
-                except Exception as e:
-                    print(f"❌ pandas 직접 읽기 실패: {e}")
-                    print("\n🔄 대체 방법 시도 중...")
-
-                    # requests로 시도
-                    import io
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-                    }
-                    response = requests.get(csv_source, headers=headers, timeout=30, allow_redirects=True)
-                    response.raise_for_status()
-
-                    # HTML인지 확인
-                    content = response.text
-                    if content.strip().startswith('<!DOCTYPE') or content.strip().startswith('<html'):
-                        print("❌ HTML 페이지가 반환되었습니다.")
-                        print("💡 대안: 파일 > 다운로드 > CSV로 로컬 파일 사용")
-                        self.logger.error(f"HTML 반환됨: {content[:200]}")
-                        return []
-
-                    # CSV 파싱
-                    df = pd.read_csv(io.StringIO(content), on_bad_lines='skip', engine='python')
-                    print("✅ CSV 파싱 완료!")
+                snapshot_file, snapshot = self.load_sheet_snapshot(csv_source)
+                if self.full_sync:
+                    snapshot = {}
+                content = self.fetch_remote_csv(csv_source, snapshot)
+
+                if content is None:
+                    # 내용이 같아도 ETag/Last-Modified가 바뀌었을 수 있으므로 스냅샷은 다시 저장
+                    snapshot['url'] = csv_source
+                    self.pending_snapshot = (snapshot_file, snapshot)
+                    print("✅ 마지막 실행 이후 시트 변경 없음")
+                    self.logger.info(f"시트 변경 없음: {csv_source}")
+                    return []
+
+                # HTML인지 확인
+                if content.strip().startswith('<!DOCTYPE') or content.strip().startswith('<html'):
+                    print("❌ HTML 페이지가 반환되었습니다.")
+                    print("💡 대안: 파일 > 다운로드 > CSV로 로컬 파일 사용")
+                    self.logger.error(f"HTML 반환됨: {content[:200]}")
+                    return []
+
+                # CSV 파싱
+                df = pd.read_csv(io.StringIO(content), on_bad_lines='skip', engine='python')
+                print("✅ CSV 다운로드 및 파싱 완료!")
             else:
                 print(f"\n📂 로컬 CSV 파일 읽는 중...")
                 df = pd.read_csv(csv_source, encoding='utf-8', on_bad_lines='skip', engine='python')
@@ -411,18 +705,16 @@ class YouTubeShortsCollectorV2:
             urls_with_keywords = []
 
             # 첫 번째 컬럼이 키워드라고 가정
-            keyword_col = df.columns[0]
-
-            for idx, row in df.iterrows():
-                keyword = str(row[keyword_col])
+            for row in df.itertuples(index=False, name=None):
+                keyword = str(row[0])
 
                 # 키워드가 비어있거나 NaN이면 건너뛰기
                 if keyword == 'nan' or not keyword.strip():
                     continue
 
                 # 각 행의 모든 셀을 검사하여 YouTube URL 찾기
-                for col in df.columns[1:]:
-                    cell_value = str(row[col])
+                for cell in row[1:]:
+                    cell_value = str(cell)
                     if ('youtube.com' in cell_value or 'youtu.be' in cell_value) and cell_value != 'nan':
                         urls_with_keywords.append({
                             'url': cell_value.strip(),
@@ -430,6 +722,19 @@ class YouTubeShortsCollectorV2:
                         })
 
             print(f"   추출된 URL: {len(urls_with_keywords)}개")
+
+            # 원격 CSV: 이전 스냅샷에 없던 (키워드, URL)만 처리
+            if snapshot is not None:
+                seen = {tuple(pair) for pair in snapshot.get('pairs', [])}
+                pairs = [(item['keyword'], item['url']) for item in urls_with_keywords]
+                urls_with_keywords = [
+                    item for item, pair in zip(urls_with_keywords, pairs) if pair not in seen
+                ]
+                snapshot['url'] = csv_source
+                snapshot['pairs'] = sorted(seen | set(pairs))
+                self.pending_snapshot = (snapshot_file, snapshot)
+                print(f"   새로 추가된 URL: {len(urls_with_keywords)}개")
+
             return urls_with_keywords
 
         except Exception as e:
@@ -443,71 +748,220 @@ class YouTubeShortsCollectorV2:
         print("📊 CSV 파일에서 URL 배치 수집 시작")
         print("="*60)
 
-        # CSV 파일 읽기
-        urls_data = self.load_urls_from_csv(csv_path)
+        # CSV 파일 읽기 (재시도 시각이 된 실패 URL을 앞에 추가)
+        with self.profiler.stage('load_csv'):
+            urls_data = self.load_urls_from_csv(csv_path)
+        retry_data = self.retry_queue.due()
+        if retry_data:
+            print(f"🔁 재시도 대상 {len(retry_data)}개를 함께 처리합니다.")
+            urls_data = retry_data + urls_data
 
         if not urls_data:
             print("❌ 처리할 URL이 없습니다.")
+            self.commit_sheet_snapshot()
             return
 
         total = len(urls_data)
         print(f"\n📋 총 {total}개의 URL을 처리합니다.")
 
-        # 진행 상황 표시
-        for idx, data in enumerate(urls_data, 1):
-            url = data['url']
-            keyword = data['keyword']
+        # batch_size 단위로 묶어서 처리 (일괄 조회로 왕복 횟수 절감)
+        for chunk_start in range(0, total, self.batch_size):
+            chunk = urls_data[chunk_start:chunk_start + self.batch_size]
+            self.process_batch(chunk, chunk_start, total)
 
-            print(f"\n{'='*60}")
-            print(f"진행: {idx}/{total} ({idx/total*100:.1f}%)")
-            print(f"키워드: {keyword}")
-            print(f"URL: {url[:80]}...")
+            # 묶음마다 중간 저장
+            print("\n💾 중간 저장 중...")
+            self.save_progress()
 
-            video_id = self.extract_video_id(url)
+        # 최종 저장
+        print("\n💾 최종 진행 상황 저장 중...")
+        self.save_progress()
+        self.commit_sheet_snapshot()
+
+        # 통계 출력
+        self.print_statistics()
+
+    def process_batch(self, chunk, offset=0, total=None):
+        """URL 묶음 처리: 기본 정보/댓글/채널은 일괄 조회, 썸네일/자막은 영상별 처리"""
+        total = total or len(chunk)
+
+        # 1단계: 비디오 ID 추출 및 중복 체크
+        targets = []
+        chunk_ids = set()
+        for idx, data in enumerate(chunk, offset + 1):
+            url = data['url']
+            keyword = data['keyword']
+            video_id = extract_video_id(url)
 
             if not video_id:
-                print("❌ 올바르지 않은 YouTube URL")
-                self.failed_urls.append({'url': url, 'keyword': keyword, 'reason': 'Invalid URL'})
+                print(f"❌ [{idx}/{total}] 올바르지 않은 YouTube URL: {url[:60]}")
+                self.failed_urls[url] = {'url': url, 'keyword': keyword, 'reason': 'Invalid URL'}
                 self.logger.warning(f"잘못된 URL: {url}")
                 continue
 
-            # 중복 체크
-            if video_id in self.processed_ids:
-                print(f"⏭️  이미 수집된 영상 (ID: {video_id})")
+            if video_id in self.processed_ids or video_id in chunk_ids:
+                print(f"⏭️  [{idx}/{total}] 이미 수집된 영상 (ID: {video_id})")
                 continue
 
-            print(f"🔍 영상 정보 수집 중... (ID: {video_id})")
+            # 필터 검사 중 제외된 영상 중복 체크
+            if video_id in self.skipped_ids:
+                print(f"⏭️  [{idx}/{total}] 수집 대상이 아닌 영상 (ID: {video_id})")
+                continue
+
+            # 삭제/비공개 등 영구 실패로 기록된 영상은 다시 요청하지 않음
+            if self.retry_queue.is_permanent(video_id):
+                print(f"⏭️  [{idx}/{total}] 수집 불가로 기록된 영상 (ID: {video_id})")
+                continue
+
+            chunk_ids.add(video_id)
+            targets.append((idx, url, keyword, video_id))
+
+        if not targets:
+            return
+
+        # 2단계: 저비용 기본 정보 일괄 조회 후 필터 검사
+        print(f"\n🔍 기본 정보 일괄 조회 중... ({len(targets)}개)")
+        with self.profiler.stage('fetch_metadata'):
+            videos = self.fetch_video_items([video_id for _, _, _, video_id in targets])
+
+        skip_reasons = {}
+        with self.profiler.stage('eligibility'):
+            for _, _, _, video_id in targets:
+                if video_id in videos:
+                    skip_reasons[video_id] = self.check_eligibility(videos[video_id])
+
+        eligible = [vid for vid in videos if not skip_reasons.get(vid)]
+
+        # 3단계: 수집 대상 영상만 댓글/채널 일괄 조회
+        # (concurrent 조회 방식이면 댓글/채널 요청을 동시에 보냄)
+        comment_ids = [vid for vid in eligible if 'commentCount' in videos[vid]['statistics']]
+        with self.profiler.stage('details'):
+            comments_by_id, channels = self.backend.fetch_details(
+                comment_ids, list({videos[vid]['snippet']['channelId'] for vid in eligible})
+            )
+
+        # 4단계: 영상별 썸네일/자막 수집 및 결과 기록
+        for idx, url, keyword, video_id in targets:
+            print(f"\n{'='*60}")
+            print(f"진행: {idx}/{total} ({idx/total*100:.1f}%)")
+            print(f"키워드: {keyword}")
+            print(f"URL: {url[:80]}...")
+
+            video = videos.get(video_id)
+            skip_reason = skip_reasons.get(video_id)
+
+            if skip_reason:
+                print(f"⏭️  수집 대상 아님: {skip_reason}")
+                self.skipped_ids.add(video_id)
+                self.skipped_videos.append({'url': url, 'keyword': keyword, 'reason': skip_reason})
+                # 재시도 대기 중이던 영상이면 실패 기록과 큐 항목 정리 (다시 요청하지 않음)
+                self.failed_urls.pop(video_id, None)
+                self.retry_queue.discard(video_id)
+                self.logger.info(f"필터 제외: {video_id} - {skip_reason}")
+                continue
 
-            video_info = self.get_video_info(video_id, keyword)
+            video_info = None
+            if video:
+                print(f"🔍 영상 정보 수집 중... (ID: {video_id})")
+                video_info = self.get_video_info(
+                    video_id, keyword,
+                    video=video,
+                    comments=comments_by_id.get(video_id, []),
+                    channel_info=channels.get(video['snippet']['channelId'])
+                )
 
             if video_info:
                 self.results.append(video_info)
                 self.processed_ids.add(video_id)
-
-                print(f"✅ 수집 완료: {video_info['title'][:50]}...")
-                print(f"   📊 조회수: {video_info['view_count']:,}")
-                print(f"   👍 좋아요: {video_info['like_count']:,}")
-                print(f"   💬 댓글: {video_info['comment_count']:,}")
-                print(f"   📝 자막: {'있음' if video_info['transcript'] else '없음'}")
-                print(f"   🖼️  썸네일: {'저장됨' if video_info['thumbnail_filename'] else '실패'}")
-
-                self.logger.info(f"수집 완료: {video_id} - {video_info['title']}")
+                self.failed_urls.pop(video_id, None)
+                self.retry_queue.record_success(video_id)
+                with self.profiler.stage('search_index'):
+                    self.search_index.index_video(video_info)
+                self.trend_store.record([video_info])
+                self.emit(video_info)
+
+                print(f"✅ 수집 완료: {video_info.title[:50]}...")
+                print(f"   📊 조회수: {video_info.view_count:,}")
+                print(f"   👍 좋아요: {video_info.like_count:,}")
+                print(f"   💬 댓글: {video_info.comment_count:,}")
+                print(f"   📝 자막: {'있음' if video_info.transcript else '없음'}")
+                print(f"   🖼️  썸네일: {'저장됨' if video_info.thumbnail_filename else '실패'}")
+
+                self.logger.info(f"수집 완료: {video_id} - {video_info.title}")
+            elif video is None and video_id not in self.fetch_errors:
+                # 요청은 성공했지만 결과가 없음 = 삭제/비공개 영상
+                print("❌ 삭제되었거나 비공개된 영상입니다.")
+                self.record_failure(url, keyword, video_id, 'Not found', transient=False)
+            elif video_id in self.fetch_errors:
+                # 요청 전체가 실패 = 영상 문제가 아니므로 시도 횟수에 넣지 않고 미룸
+                print("❌ 영상 정보를 가져올 수 없습니다. (요청 실패 - 나중에 다시 시도)")
+                self.defer_failure(url, keyword, video_id, self.fetch_errors.pop(video_id))
             else:
                 print("❌ 영상 정보를 가져올 수 없습니다.")
-                self.failed_urls.append({'url': url, 'keyword': keyword, 'reason': 'Failed to fetch'})
-                self.logger.error(f"수집 실패: {url}")
-
-            # 10개마다 중간 저장
-            if idx % 10 == 0:
-                print("\n💾 중간 저장 중...")
-                self.save_progress()
+                self.record_failure(url, keyword, video_id, 'Failed to process', transient=True)
+
+    def record_failure(self, url, keyword, video_id, reason, transient):
+        """실패 URL 기록 및 재시도 큐 등록"""
+        self.failed_urls[video_id] = {'url': url, 'keyword': keyword, 'reason': reason}
+        self.retry_queue.record_failure(video_id, url, keyword, reason, transient)
+        self.logger.error(f"수집 실패 ({'일시' if transient else '영구'}): {url} - {reason}")
+
+    def defer_failure(self, url, keyword, video_id, error):
+        """요청 단위 오류 기록 (할당량 초과는 할당량 초기화 시각까지 미룸)"""
+        retry_at = None
+        if is_quota_error(error):
+            retry_at = datetime.fromtimestamp(self.quota_reset_at())
+            reason = 'Quota exceeded'
+        else:
+            reason = f"Request failed: {str(error)[:200]}"
+        self.failed_urls[video_id] = {'url': url, 'keyword': keyword, 'reason': reason}
+        self.retry_queue.defer(video_id, url, keyword, reason, retry_at)
+        self.logger.error(f"수집 연기: {url} - {reason}")
+
+    def drain_retries(self, limit=None):
+        """재시도 시각이 된 실패 URL을 다시 수집"""
+        due = self.retry_queue.due(limit)
+        if not due:
+            print("\n🔁 재시도할 URL이 없습니다.")
+            return
 
-        # 최종 저장
-        print("\n💾 최종 진행 상황 저장 중...")
+        print(f"\n🔁 재시도 대상 {len(due)}개 처리 중...")
+        for chunk_start in range(0, len(due), self.batch_size):
+            self.process_batch(due[chunk_start:chunk_start + self.batch_size], chunk_start, len(due))
         self.save_progress()
 
-        # 통계 출력
-        self.print_statistics()
+    def refresh_statistics(self):
+        """수집된 영상의 조회수/좋아요/댓글 수 갱신 (statistics만 일괄 조회)"""
+        videos_by_id = {video.video_id: video for video in self.results}
+        video_ids = list(videos_by_id)
+        updated = []
+
+        items, errors = self.backend.fetch_videos(video_ids, part='statistics')
+        self.check_fetch_result(items, errors)
+        for video_id, item in items.items():
+            statistics = item['statistics']
+            video = videos_by_id[video_id]
+            video.view_count = int(statistics.get('viewCount', 0))
+            video.like_count = int(statistics.get('likeCount', 0))
+            video.comment_count = int(statistics.get('commentCount', 0))
+            updated.append(video)
+
+        # 갱신된 통계를 같은 시각의 스냅샷으로 기록
+        self.trend_store.record(updated)
+        self.save_progress()
+        self.logger.info(f"통계 갱신 완료: {len(updated)}/{len(video_ids)}개")
+        return len(updated)
+
+    def save_trends(self, filename, top_n=10):
+        """키워드별 급상승 영상 순위를 JSON 파일로 저장"""
+        with self.profiler.stage('trends'):
+            ranking = top_movers(self.trend_store, top_n)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'keywords': ranking
+            }, f, ensure_ascii=False, indent=2)
+        self.logger.info(f"트렌드 순위 저장: {filename} ({len(ranking)}개 키워드)")
 
     def print_statistics(self):
         """수집 통계 출력"""
@@ -516,16 +970,19 @@ class YouTubeShortsCollectorV2:
         print("="*60)
         print(f"✅ 성공: {len(self.results)}개")
         print(f"❌ 실패: {len(self.failed_urls)}개")
+        print(f"⏭️  필터 제외: {len(self.skipped_videos)}개")
+        queue_stats = self.retry_queue.stats()
+        print(f"🔁 재시도 대기: {queue_stats['transient']}개 (영구 실패: {queue_stats['permanent']}개)")
 
         if self.results:
             # 키워드별 통계
             keywords = {}
             for item in self.results:
-                kw = item.get('keyword', '미분류')
+                kw = item.keyword or '미분류'
                 if kw not in keywords:
                     keywords[kw] = {'count': 0, 'total_views': 0}
                 keywords[kw]['count'] += 1
-                keywords[kw]['total_views'] += item['view_count']
+                keywords[kw]['total_views'] += item.view_count
 
             print(f"\n📊 키워드별 통계:")
             for kw, stats in keywords.items():
@@ -534,100 +991,413 @@ class YouTubeShortsCollectorV2:
 
         if self.failed_urls:
             print(f"\n❌ 실패한 URL:")
-            for item in self.failed_urls[:5]:  # 최대 5개만 표시
+            for item in list(self.failed_urls.values())[:5]:  # 최대 5개만 표시
                 print(f"   {item['url'][:60]}... - {item['reason']}")
             if len(self.failed_urls) > 5:
                 print(f"   ... 외 {len(self.failed_urls) - 5}개")
 
-    def save_results(self):
-        """결과 저장"""
+    def open_sinks(self):
+        """결과 파일 백그라운드 저장 시작 (이전 진행 상황의 결과도 먼저 기록)"""
+        self.sink_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.sinks = [ExcelSink(f"YouTube_Shorts_Data_{self.sink_timestamp}.xlsx", logger=self.logger)]
+        if self.json_export:
+            self.sinks.append(JsonSink(f"YouTube_Shorts_Data_{self.sink_timestamp}.json", logger=self.logger))
+        if self.jsonl_export:
+            self.sinks.append(JsonlSink(
+                f"YouTube_Shorts_Data_{self.sink_timestamp}_jsonl",
+                self.jsonl_export, self.jsonl_shard_by, logger=self.logger
+            ))
+
+        for sink in self.sinks:
+            sink.start()
+        for video in self.results:
+            self.emit(video)
+
+    def emit(self, video):
+        """수집 완료된 영상을 백그라운드 저장 스레드로 전달"""
+        for sink in self.sinks:
+            sink.put(video)
+
+    def close_sinks(self):
+        """백그라운드 저장 마무리 (남은 영상 기록 후 파일 닫기)"""
+        print(f"\n💾 {len(self.results)}개 영상 데이터 저장 마무리 중...")
+        for sink in self.sinks:
+            if not sink.finish():
+                print(f"❌ 파일 저장 오류 ({sink.filename}): {sink.error}")
+            elif sink.count:
+                print(f"✅ 파일 저장 완료: {sink.filename}")
+
         if not self.results:
-            print("\n❌ 저장할 데이터가 없습니다.")
-            return
+            print("❌ 저장할 데이터가 없습니다.")
+        self.save_failed_urls(self.sink_timestamp)
+        self.logger.info(f"결과 저장 완료: {[sink.filename for sink in self.sinks]}")
+        self.sinks = []
 
-        print(f"\n💾 {len(self.results)}개 영상 데이터 저장 중...")
+    def save_failed_urls(self, timestamp):
+        """실패 목록 저장"""
+        if self.failed_urls:
+            failed_filename = f"Failed_URLs_{timestamp}.json"
+            with open(failed_filename, 'w', encoding='utf-8') as f:
+                json.dump(list(self.failed_urls.values()), f, ensure_ascii=False, indent=2)
+            print(f"⚠️  실패 URL 목록 저장: {failed_filename}")
+
+    def save_results(self):
+        """결과 저장 (백그라운드 저장 중이면 마무리만)"""
+        with self.profiler.stage('save_results'):
+            if self.sinks:
+                self.close_sinks()
+                return
+
+            if not self.results:
+                print("\n❌ 저장할 데이터가 없습니다.")
+                return
+
+            print(f"\n💾 {len(self.results)}개 영상 데이터 저장 중...")
+
+            try:
+                # 기본 정보 데이터프레임
+                basic_data = [video_row(item) for item in self.results]
+
+                # 댓글 데이터프레임
+                comment_data = [row for item in self.results for row in comment_rows(item)]
+
+                # 스크립트 데이터프레임
+                script_data = [row for row in map(script_row, self.results) if row]
+
+                # 파일명 생성
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"YouTube_Shorts_Data_{timestamp}.xlsx"
+
+                # Excel 파일 저장
+                with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+                    pd.DataFrame(basic_data).to_excel(writer, sheet_name='영상정보', index=False)
+                    if comment_data:
+                        pd.DataFrame(comment_data).to_excel(writer, sheet_name='댓글정보', index=False)
+                    if script_data:
+                        pd.DataFrame(script_data).to_excel(writer, sheet_name='스크립트', index=False)
+
+                print(f"✅ Excel 파일 저장 완료: {filename}")
+
+                # JSON 파일도 저장 (사람이 읽을 수 있는 백업용, 선택)
+                if self.json_export:
+                    json_filename = f"YouTube_Shorts_Data_{timestamp}.json"
+                    with open(json_filename, 'w', encoding='utf-8') as f:
+                        json.dump([item.to_dict() for item in self.results], f, ensure_ascii=False, indent=2)
+
+                    print(f"✅ JSON 파일 저장 완료: {json_filename}")
+
+                # 샤딩 JSONL 아카이브 (선택)
+                if self.jsonl_export:
+                    archive_dir = f"YouTube_Shorts_Data_{timestamp}_jsonl"
+                    writer = JsonlArchiveWriter(archive_dir, self.jsonl_export, self.jsonl_shard_by)
+                    for item in self.results:
+                        writer.write(item.to_dict())
+                    writer.close()
+                    print(f"✅ JSONL 아카이브 저장 완료: {archive_dir}/")
+
+                # 실패 목록 저장
+                self.save_failed_urls(timestamp)
+
+                self.logger.info(f"결과 저장 완료: {filename}")
+
+            except Exception as e:
+                print(f"❌ 파일 저장 오류: {e}")
+                self.logger.error(f"파일 저장 오류: {e}")
+
+
+def parse_sizes(value):
+    """'160x90,320x180' -> [(160, 90), (320, 180)]"""
+    try:
+        return [tuple(int(number) for number in size.lower().split('x')) for size in value.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"크기 형식이 올바르지 않습니다: {value} (예: 160x90)")
+
+
+def parse_args():
+    """명령행 인자 파싱 (하위 명령이 없으면 대화형 수집)"""
+    parser = argparse.ArgumentParser(description="YouTube Shorts 데이터 수집기 v2")
+    parser.add_argument('--full-sync', action='store_true',
+                        help='원격 CSV의 변경 여부와 관계없이 모든 행을 다시 처리')
+    parser.add_argument('--profile', action='store_true',
+                        help='단계별 CPU/메모리 프로파일 보고서 저장 (profile_reports/)')
+    parser.add_argument('--no-json', action='store_true',
+                        help='JSON 백업 파일을 저장하지 않음 (Excel/JSONL만 저장)')
+    parser.add_argument('--jsonl', choices=['gzip', 'zstd'], default=None,
+                        help='샤딩/압축 JSONL 아카이브도 저장 (영상 ID로 1건씩 읽기 가능)')
+    parser.add_argument('--shard-by', choices=['keyword', 'size'], default='keyword',
+                        help='JSONL 샤드 기준 (기본: 키워드별)')
+    parser.add_argument('--backend', choices=['serial', 'batch', 'concurrent'], default='batch',
+                        help='API 조회 방식 (기본: batch - ID를 묶어 조회, concurrent - 묶음을 동시에 조회)')
+    parser.add_argument('--thumbnail-previews', type=parse_sizes, default=[], metavar='160x90[,320x180]',
+                        help='썸네일 미리보기 크기 (Pillow 필요, 프로세스 풀에서 생성)')
+    subparsers = parser.add_subparsers(dest='command')
+
+    retry_parser = subparsers.add_parser('retry', help='재시도 큐에 쌓인 실패 URL만 다시 수집')
+    retry_parser.add_argument('--limit', type=int, default=None, help='최대 재시도 개수')
+
+    search_parser = subparsers.add_parser('search', help='수집된 제목/설명/태그/자막/댓글 전문 검색')
+    search_parser.add_argument('query', help='검색할 문구')
+    search_parser.add_argument('--keyword', default=None, help='수집 키워드로 필터링')
+    search_parser.add_argument('--field', default=None,
+                               choices=['title', 'description', 'tags', 'transcript', 'comment'],
+                               help='검색할 항목')
+    search_parser.add_argument('--limit', type=int, default=20, help='최대 결과 수')
+
+    subparsers.add_parser('reindex', help='저장된 진행 상황의 수집 결과로 검색 인덱스 재생성')
+
+    trends_parser = subparsers.add_parser('trends', help='통계 스냅샷으로 키워드별 조회수 급상승 영상 순위')
+    trends_parser.add_argument('--keyword', default=None, help='이 키워드만 분석')
+    trends_parser.add_argument('--top', type=int, default=10, help='키워드별 표시할 영상 수')
+    trends_parser.add_argument('--window-hours', type=float, default=None, help='최근 N시간 스냅샷만 사용')
+    trends_parser.add_argument('--sort', default='velocity',
+                               choices=['velocity', 'acceleration', 'like_ratio_change'],
+                               help='정렬 기준 (기본: 시간당 조회수)')
+
+    get_parser = subparsers.add_parser('get', help='JSONL 아카이브에서 영상 1건 읽기')
+    get_parser.add_argument('archive_dir', help='JSONL 아카이브 폴더')
+    get_parser.add_argument('video_id', help='영상 ID')
+
+    daemon_parser = subparsers.add_parser('daemon', help='CSV 동기화/통계 갱신/재시도/내보내기를 주기적으로 실행')
+    daemon_parser.add_argument('--csv', default=None, help='주기적으로 동기화할 CSV 파일 경로 또는 URL')
+    daemon_parser.add_argument('--config', default='daemon_config.json', help='데몬 설정 파일')
+
+    args = parser.parse_args()
+    # 압축 라이브러리가 없으면 수집을 마친 뒤 저장 단계에서야 실패하므로 미리 확인
+    try:
+        check_compression(args.jsonl)
+    except RuntimeError as e:
+        parser.error(str(e))
+    return args
+
+
+def create_collector(args):
+    """공통 명령행 옵션을 적용한 수집기 생성"""
+    collector = YouTubeShortsCollectorV2()
+    collector.full_sync = args.full_sync
+    collector.profiler.enabled = args.profile
+    collector.json_export = not args.no_json
+    collector.jsonl_export = args.jsonl
+    collector.jsonl_shard_by = args.shard_by
+    collector.fetch_backend = args.backend
+    collector.thumbnail_store.derivative_sizes = args.thumbnail_previews
+    return collector
 
-        try:
-            # 기본 정보 데이터프레임
-            basic_data = []
-            for item in self.results:
-                basic_data.append({
-                    '영상 ID': item['video_id'],
-                    '키워드': item.get('keyword', ''),
-                    '제목': item['title'],
-                    '채널명': item['channel_title'],
-                    '업로드 날짜': item['published_at'],
-                    '조회수': item['view_count'],
-                    '좋아요 수': item['like_count'],
-                    '댓글 수': item['comment_count'],
-                    '구독자 수': item['subscriber_count'],
-                    '태그': item['tags'],
-                    '설명': item['description'],
-                    '썸네일 파일명': item.get('thumbnail_filename', '')
-                })
-
-            # 댓글 데이터프레임
-            comment_data = []
-            for item in self.results:
-                for comment in item['comments']:
-                    comment_data.append({
-                        '영상 ID': item['video_id'],
-                        '키워드': item.get('keyword', ''),
-                        '영상 제목': item['title'],
-                        '댓글 작성자': comment['author'],
-                        '댓글 내용': comment['text'],
-                        '댓글 좋아요': comment['like_count'],
-                        '댓글 작성일': comment['published_at']
-                    })
-
-            # 스크립트 데이터프레임
-            script_data = []
-            for item in self.results:
-                if item.get('transcript'):
-                    script_data.append({
-                        '영상 ID': item['video_id'],
-                        '키워드': item.get('keyword', ''),
-                        '영상 제목': item['title'],
-                        '스크립트': item['transcript']
-                    })
-
-            # 파일명 생성
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"YouTube_Shorts_Data_{timestamp}.xlsx"
-
-            # Excel 파일 저장
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                pd.DataFrame(basic_data).to_excel(writer, sheet_name='영상정보', index=False)
-                if comment_data:
-                    pd.DataFrame(comment_data).to_excel(writer, sheet_name='댓글정보', index=False)
-                if script_data:
-                    pd.DataFrame(script_data).to_excel(writer, sheet_name='스크립트', index=False)
-
-            print(f"✅ Excel 파일 저장 완료: {filename}")
-
-            # JSON 파일도 저장 (백업용)
-            json_filename = f"YouTube_Shorts_Data_{timestamp}.json"
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(self.results, f, ensure_ascii=False, indent=2)
-
-            print(f"✅ JSON 파일 저장 완료: {json_filename}")
-
-            # 실패 목록 저장
-            if self.failed_urls:
-                failed_filename = f"Failed_URLs_{timestamp}.json"
-                with open(failed_filename, 'w', encoding='utf-8') as f:
-                    json.dump(self.failed_urls, f, ensure_ascii=False, indent=2)
-                print(f"⚠️  실패 URL 목록 저장: {failed_filename}")
-
-            self.logger.info(f"결과 저장 완료: {filename}")
 
+def print_api_key_error(collector, error):
+    """키 오류로 수집이 중단되었을 때 안내 (처리하지 못한 URL은 다음 실행에서 다시 처리)"""
+    collector.save_progress()
+    print(f"\n❌ API 키가 유효하지 않아 수집을 중단했습니다: {error}")
+    print("💡 다음 실행 시 새로운 API 키를 입력해주세요. 처리하지 못한 URL은 다시 수집됩니다.")
+
+
+def write_profile_reports(collector):
+    """프로파일 모드일 때 단계별 보고서 저장"""
+    report_dir = collector.profiler.write_reports()
+    if report_dir:
+        print(f"📈 프로파일 보고서 저장: {report_dir}/ (summary.txt, callgraph.prof)")
+
+
+def run_retry(args):
+    """재시도 모드: 이전 진행 상황에 이어서 재시도 큐만 처리"""
+    print("🔁 YouTube Shorts 데이터 수집기 v2 - 재시도 모드")
+    print("=" * 60)
+
+    collector = create_collector(args)
+    collector.load_progress()
+    collector.setup_api_key()
+
+    collector.open_sinks()
+    try:
+        collector.drain_retries(args.limit)
+    except ApiKeyError as e:
+        print_api_key_error(collector, e)
+    collector.thumbnail_store.close()
+    collector.print_statistics()
+    collector.save_results()
+    write_profile_reports(collector)
+
+
+def run_search(args):
+    """검색 모드: 로컬 검색 인덱스에서 문구 검색"""
+    index = SearchIndex()
+    if not index.enabled:
+        print("❌ 이 환경의 SQLite는 FTS5를 지원하지 않아 검색할 수 없습니다.")
+        return
+    started = time.perf_counter()
+    rows = index.search(args.query, keyword=args.keyword, field=args.field, limit=args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    index.close()
+
+    print(f"🔎 '{args.query}' 검색 결과: {len(rows)}건 ({elapsed:.1f}ms)")
+    for video_id, keyword, field, author, text in rows:
+        who = f" @{author}" if author else ""
+        print(f"   [{keyword}] https://youtube.com/shorts/{video_id} ({field}{who})")
+        print(f"      {' '.join(text.split())}")
+
+
+def run_trends(args):
+    """트렌드 모드: 저장된 통계 스냅샷으로 키워드별 급상승 영상 출력"""
+    store = SnapshotStore()
+    started = time.perf_counter()
+    ranking = top_movers(store, args.top, keyword=args.keyword, window_hours=args.window_hours, sort_by=args.sort)
+    elapsed = time.perf_counter() - started
+
+    if not ranking:
+        print("❌ 순위를 매길 스냅샷이 없습니다. 통계 갱신(데몬 stats_refresh)을 2회 이상 실행해야 합니다.")
+        return
+
+    print(f"📈 키워드별 급상승 영상 ({elapsed:.2f}초)")
+    for keyword, videos in ranking.items():
+        print(f"\n[{keyword or '미분류'}]")
+        for rank, video in enumerate(videos, 1):
+            print(f"   {rank:>2}. https://youtube.com/shorts/{video['video_id']}"
+                  f"  조회수 {video['views']:,} | 시간당 {video['views_per_hour']:+,.0f}"
+                  f" | 가속도 {video['acceleration']:+,.1f}/h | 좋아요 비율 변화 {video['like_ratio_change']:+.2%}")
+
+
+def run_get(args):
+    """아카이브 조회 모드: 영상 ID로 레코드 1건 출력"""
+    archive = JsonlArchive(args.archive_dir)
+    record = archive.get(args.video_id)
+    archive.close()
+
+    if record is None:
+        print(f"❌ 아카이브에 없는 영상입니다: {args.video_id}")
+        return
+    print(json.dumps(record, ensure_ascii=False, indent=2))
+
+
+def run_reindex(args):
+    """인덱스 재생성 모드: 저장된 진행 상황으로 검색 인덱스 재생성"""
+    collector = YouTubeShortsCollectorV2()
+    if not collector.search_index.enabled:
+        print("❌ 이 환경의 SQLite는 FTS5를 지원하지 않아 검색 인덱스를 만들 수 없습니다.")
+        return
+    if collector.load_progress():
+        collector.search_index.rebuild(collector.results)
+        print(f"✅ 검색 인덱스 재생성 완료: {len(collector.results)}개 영상")
+
+
+def load_daemon_config(config_file, logger):
+    """데몬 설정 불러오기 (파일이 없거나 읽을 수 없으면 기본값 사용)"""
+    config = {}
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            if not isinstance(config, dict):
+                raise ValueError("JSON 객체 형식이어야 합니다.")
         except Exception as e:
-            print(f"❌ 파일 저장 오류: {e}")
-            self.logger.error(f"파일 저장 오류: {e}")
+            logger.error(f"데몬 설정 불러오기 실패: {e}")
+            print(f"⚠️ 데몬 설정 파일을 읽을 수 없어 기본값을 사용합니다: {e}")
+            config = {}
+    return normalize_daemon_config(config, logger)
+
+
+def run_daemon(args):
+    """데몬 모드: API 클라이언트/캐시/저장소를 열어둔 채 작업을 주기적으로 실행"""
+    print("🛰️  YouTube Shorts 데이터 수집기 v2 - 데몬 모드")
+    print("=" * 60)
+
+    collector = create_collector(args)
+    config = load_daemon_config(args.config, collector.logger)
+    csv_source = args.csv or config['csv_source']
+
+    collector.load_progress()
+
+    # 대화형 입력 없이 환경 변수 또는 저장된 API 키 사용
+    api_key = os.environ.get('YOUTUBE_API_KEY') or collector.load_api_key()
+    if not api_key:
+        print("❌ API 키가 없습니다. YOUTUBE_API_KEY 환경 변수를 설정하거나 먼저 대화형으로 키를 저장하세요.")
+        return
+    if collector.key_status(api_key) is False:
+        print("❌ 이전 실행에서 유효하지 않은 것으로 확인된 API 키입니다. 새 키를 설정하세요.")
+        return
+    collector.connect(api_key)
+
+    scheduler = JobScheduler(
+        status_file=config['status_file'],
+        quota_remaining=collector.quota_remaining,
+        quota_reset_at=collector.quota_reset_at,
+        quota_reserve=config['quota_reserve'],
+        fatal_errors=(ApiKeyError,),
+        logger=collector.logger
+    )
+    jitter = config['jitter']
+
+    if csv_source:
+        scheduler.add_job(
+            'csv_sync', lambda: collector.collect_from_csv(csv_source),
+            config['csv_sync_minutes'] * 60, jitter,
+            quota_cost=lambda: 3 * collector.batch_size
+        )
+    scheduler.add_job(
+        'stats_refresh', collector.refresh_statistics,
+        config['stats_refresh_minutes'] * 60, jitter,
+        quota_cost=lambda: -(-len(collector.results) // collector.batch_size),
+        run_immediately=False
+    )
+    scheduler.add_job(
+        'retry', collector.drain_retries,
+        config['retry_minutes'] * 60, jitter,
+        quota_cost=lambda: 3 * len(collector.retry_queue.due())
+    )
+    scheduler.add_job(
+        'export', collector.save_results,
+        config['export_minutes'] * 60, jitter,
+        run_immediately=False
+    )
+    scheduler.add_job(
+        'trends', lambda: collector.save_trends(config['trends_file']),
+        config['trends_minutes'] * 60, jitter,
+        run_immediately=False
+    )
+
+    # 종료 신호를 받으면 진행 중인 작업을 마친 뒤 종료
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+
+    print(f"📋 등록된 작업: {', '.join(job.name for job in scheduler.jobs)}")
+    print(f"📄 상태 파일: {config['status_file']}")
+    print("💡 종료: Ctrl+C")
+
+    try:
+        scheduler.run_forever()
+        if scheduler.fatal_error is not None:
+            print_api_key_error(collector, scheduler.fatal_error)
+    except KeyboardInterrupt:
+        scheduler.stop()
+        scheduler.write_status()
+    finally:
+        collector.save_progress()
+        collector.search_index.close()
+        collector.trend_store.close()
+        collector.thumbnail_store.close()
+        write_profile_reports(collector)
+        print("\n👋 데몬을 종료했습니다.")
 
 
 def main():
     """메인 함수"""
+    args = parse_args()
+    if args.command == 'retry':
+        run_retry(args)
+        return
+    if args.command == 'search':
+        run_search(args)
+        return
+    if args.command == 'reindex':
+        run_reindex(args)
+        return
+    if args.command == 'get':
+        run_get(args)
+        return
+    if args.command == 'trends':
+        run_trends(args)
+        return
+    if args.command == 'daemon':
+        run_daemon(args)
+        return
+
     print("🎬 YouTube Shorts 데이터 수집기 v2")
     print("=" * 60)
     print("📝 새로운 기능:")
@@ -639,17 +1409,25 @@ def main():
     print("   • Excel 파일로 자동 저장")
     print("=" * 60)
 
-    collector = YouTubeShortsCollectorV2()
+    collector = create_collector(args)
 
     # 이전 진행 상황 불러오기 선택
-    if os.path.exists(collector.progress_file):
+    if collector.has_progress():
         choice = input("\n이전 진행 상황을 불러오시겠습니까? (y/n): ").strip().lower()
         if choice == 'y':
             collector.load_progress()
+        else:
+            # 새로 시작하면 진행 상황 파일이 새 결과로 바뀌므로 검색 인덱스도 비움
+            collector.search_index.rebuild([])
 
     # API 키 설정
     collector.setup_api_key()
 
+    # 필터 규칙 표시
+    print("\n🧹 수집 대상 필터 규칙 (변경: eligibility_rules.json)")
+    for rule, value in collector.eligibility_rules.items():
+        print(f"   {rule}: {value}")
+
     # CSV 파일 경로 또는 URL 입력
     print("\n" + "="*60)
     print("📁 CSV 데이터 소스 선택")
@@ -680,11 +1458,17 @@ def main():
         else:
             print("❌ 파일을 찾을 수 없습니다. URL이거나 올바른 파일 경로를 입력해주세요.")
 
-    # 데이터 수집
-    collector.collect_from_csv(csv_source)
+    # 데이터 수집 (수집과 동시에 결과 파일 백그라운드 저장)
+    collector.open_sinks()
+    try:
+        collector.collect_from_csv(csv_source)
+    except ApiKeyError as e:
+        print_api_key_error(collector, e)
+    collector.thumbnail_store.close()
 
     # 결과 저장
     collector.save_results()
+    write_profile_reports(collector)
 
     print("\n🎉 프로그램 실행 완료!")
     print("📁 생성된 파일을 확인해보세요.")